@@ -0,0 +1,97 @@
+"""
+Cold vs warm start times for EmotionAnalyzer.load_model
+
+Copies the local model directory to a scratch location as a pristine
+pickle-only checkpoint (pytorch_model.bin, rebuilt from the safetensors
+weights if the app already converted it) without the derived artifacts
+(fingerprint, traced graph, ONNX export), then starts a fresh Python process
+several times in a row. The first start pays for the safetensors conversion
+and the tracing or export; the following ones reuse the cached artifacts.
+
+Usage:
+    python benchmarks/bench_cold_start.py [--model-path PATH] [--backend torchscript] [--runs 3]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from core.model_artifacts import PICKLE_WEIGHTS_FILE, SAFETENSORS_FILE
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD_SCRIPT = """
+import json, sys
+sys.path.insert(0, {root!r})
+import config
+config.MODEL_PATH = {model_path!r}
+config.ONNX_MODEL_PATH = {onnx_path!r}
+config.EMOTION_BACKEND = {backend!r}
+config.EMOTION_CACHE_PERSIST = False
+from core.emotion_analyzer import EmotionAnalyzer
+analyzer = EmotionAnalyzer()
+ok = analyzer.load_model()
+print('LOAD_STATS=' + json.dumps(analyzer.load_stats if ok else None))
+"""
+
+
+def copy_pristine_checkpoint(source, target):
+    """Copy config and tokenizer files plus the weights as a pickle, the format ensure_safetensors converts"""
+    shutil.copytree(
+        source,
+        target,
+        ignore=shutil.ignore_patterns('traced', '*.sha256.json', '*.onnx', SAFETENSORS_FILE, PICKLE_WEIGHTS_FILE)
+    )
+
+    pickle_path = os.path.join(source, PICKLE_WEIGHTS_FILE)
+    if os.path.exists(pickle_path):
+        shutil.copy2(pickle_path, target)
+        return
+
+    # Already converted in place (the .bin is deleted then), so pickle the safetensors weights again
+    import torch
+    from safetensors.torch import load_file
+    torch.save(load_file(os.path.join(source, SAFETENSORS_FILE)), os.path.join(target, PICKLE_WEIGHTS_FILE))
+
+
+def run_start(model_path, onnx_path, backend):
+    """Load the model in a brand new interpreter and return its load stats"""
+    script = CHILD_SCRIPT.format(root=ROOT_DIR, model_path=model_path, onnx_path=onnx_path, backend=backend)
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True).stdout
+    for line in output.splitlines():
+        if line.startswith('LOAD_STATS='):
+            return json.loads(line[len('LOAD_STATS='):])
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-path', default=config.MODEL_PATH, help="Local model directory to copy")
+    parser.add_argument('--backend', default='torchscript', help="Inference backend to start")
+    parser.add_argument('--runs', type=int, default=3, help="Number of consecutive starts")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.model_path):
+        print(f"❌ No local model at {args.model_path}")
+        sys.exit(1)
+    if not any(os.path.exists(os.path.join(args.model_path, name)) for name in (SAFETENSORS_FILE, PICKLE_WEIGHTS_FILE)):
+        print(f"❌ No {SAFETENSORS_FILE} or {PICKLE_WEIGHTS_FILE} in {args.model_path}")
+        sys.exit(1)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        model_path = os.path.join(scratch, 'model')
+        copy_pristine_checkpoint(args.model_path, model_path)
+        onnx_path = os.path.join(scratch, 'model.onnx')
+
+        starts = [run_start(model_path, onnx_path, args.backend) for _ in range(args.runs)]
+
+    print(json.dumps({'backend': args.backend, 'starts': starts}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Inference benchmark suite for EmotionAnalyzer
+
+Sweeps text length, batch size and thread count over a synthetic journal
+corpus and reports p50/p95/p99 latency, texts per second, peak RSS and the
+split between tokenizer and model time. Results are written as JSON so runs
+can be compared over time.
+
+Runs fully offline: it uses the locally cached model in config.MODEL_PATH,
+or with --tiny builds a small randomly initialised RoBERTa stand-in (same
+label set, same code paths) in a temporary directory.
+
+Usage:
+    python benchmarks/bench_emotion.py --tiny --output results.json
+    python benchmarks/bench_emotion.py --lengths 16 128 --batch-sizes 1 16 --threads 1 4
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+CORPUS_WORDS = (
+    "i am feeling so really very quite a bit today tomorrow this week exam test deadline project "
+    "study studying focus tired stressed anxious worried nervous scared sad lonely grateful happy "
+    "excited proud calm relieved confused angry annoyed frustrated hopeful motivated overwhelmed "
+    "friends family sleep coffee library notes chapter math history chemistry essay finally again"
+).split()
+
+
+def synthetic_corpus(num_texts: int, words_per_text: int, seed: int = 0):
+    """Deterministic pseudo-journal entries of roughly `words_per_text` words"""
+    rng = random.Random(seed * 100003 + words_per_text)
+    texts = []
+    for _ in range(num_texts):
+        length = max(1, int(rng.gauss(words_per_text, words_per_text * 0.15)))
+        texts.append(' '.join(rng.choice(CORPUS_WORDS) for _ in range(length)))
+    return texts
+
+
+def build_tiny_model(target_dir: str):
+    """Create a small RoBERTa classifier with the GoEmotions labels and a corpus-trained tokenizer"""
+    from tokenizers import ByteLevelBPETokenizer
+    from transformers import RobertaConfig, RobertaForSequenceClassification, RobertaTokenizerFast
+
+    os.makedirs(target_dir, exist_ok=True)
+    bpe = ByteLevelBPETokenizer()
+    bpe.train_from_iterator(
+        synthetic_corpus(2000, 40),
+        vocab_size=1000,
+        special_tokens=["<s>", "<pad>", "</s>", "<unk>", "<mask>"]
+    )
+    bpe.save_model(target_dir)
+    tokenizer = RobertaTokenizerFast(
+        vocab_file=os.path.join(target_dir, "vocab.json"),
+        merges_file=os.path.join(target_dir, "merges.txt")
+    )
+
+    labels = list(config.EMOTION_RISK_MAP.keys())
+    model_config = RobertaConfig(
+        vocab_size=len(tokenizer),
+        hidden_size=128,
+        num_hidden_layers=2,
+        num_attention_heads=4,
+        intermediate_size=256,
+        max_position_embeddings=config.EMOTION_MAX_LENGTH + 2,
+        type_vocab_size=1,
+        pad_token_id=tokenizer.pad_token_id,
+        bos_token_id=tokenizer.bos_token_id,
+        eos_token_id=tokenizer.eos_token_id,
+        num_labels=len(labels),
+        id2label=dict(enumerate(labels)),
+        label2id={label: i for i, label in enumerate(labels)}
+    )
+    tokenizer.save_pretrained(target_dir)
+    RobertaForSequenceClassification(model_config).save_pretrained(target_dir, safe_serialization=True)
+
+
+class TimedTokenizer:
+    """Transparent tokenizer proxy that accumulates time spent tokenizing and padding"""
+
+    def __init__(self, tokenizer):
+        self._tokenizer = tokenizer
+        self.seconds = 0.0
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._tokenizer(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def pad(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self._tokenizer.pad(*args, **kwargs)
+        finally:
+            self.seconds += time.perf_counter() - start
+
+    def __getattr__(self, name):
+        return getattr(self._tokenizer, name)
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far (ru_maxrss is KiB on Linux)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def run_case(analyzer, texts, batch_size, iterations):
+    """Time one configuration; latency is per call (a single text or one batch)"""
+    tokenizer = analyzer.tokenizer
+    predict = analyzer._predict
+    model_time = [0.0]
+
+    def timed_predict(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return predict(*args, **kwargs)
+        finally:
+            model_time[0] += time.perf_counter() - start
+
+    timed_tokenizer = TimedTokenizer(tokenizer)
+    analyzer.tokenizer = timed_tokenizer
+    analyzer._predict = timed_predict
+
+    latencies = []
+    processed = 0
+    try:
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for offset in range(0, len(texts), batch_size):
+                chunk = texts[offset:offset + batch_size]
+                call_start = time.perf_counter()
+                if batch_size == 1:
+                    analyzer.analyze_emotion(chunk[0])
+                else:
+                    analyzer.analyze_emotions_batch(chunk, batch_size=batch_size)
+                latencies.append(time.perf_counter() - call_start)
+                processed += len(chunk)
+        wall = time.perf_counter() - started
+    finally:
+        analyzer.tokenizer = tokenizer
+        del analyzer._predict
+
+    latencies.sort()
+    return {
+        'calls': len(latencies),
+        'texts': processed,
+        'latency_ms': {
+            'p50': percentile(latencies, 50) * 1000,
+            'p95': percentile(latencies, 95) * 1000,
+            'p99': percentile(latencies, 99) * 1000,
+            'mean': statistics.fmean(latencies) * 1000
+        },
+        'texts_per_second': processed / wall if wall else 0.0,
+        'tokenizer_seconds': timed_tokenizer.seconds,
+        'model_seconds': model_time[0],
+        'other_seconds': max(0.0, wall - timed_tokenizer.seconds - model_time[0]),
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-path', default=config.MODEL_PATH, help="Local model directory")
+    parser.add_argument('--tiny', action='store_true', help="Benchmark a small random stand-in model")
+    parser.add_argument('--backend', default=config.EMOTION_BACKEND, help="Inference backend")
+    parser.add_argument('--lengths', type=int, nargs='+', default=[16, 64, 256], help="Words per text")
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=[1, 8, 32], help="Texts per call")
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, os.cpu_count() or 1], help="torch threads")
+    parser.add_argument('--texts', type=int, default=64, help="Texts per configuration")
+    parser.add_argument('--iterations', type=int, default=2, help="Passes over the texts per configuration")
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    import torch
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if args.tiny:
+            args.model_path = os.path.join(scratch, 'tiny_model')
+            build_tiny_model(args.model_path)
+        elif not os.path.isdir(args.model_path):
+            print(f"❌ No local model at {args.model_path}; run the app once or pass --tiny")
+            sys.exit(1)
+
+        config.MODEL_PATH = args.model_path
+        config.ONNX_MODEL_PATH = os.path.join(scratch, 'model.onnx')
+        config.EMOTION_BACKEND = args.backend
+        config.EMOTION_CACHE_SIZE = 0
+        config.EMOTION_CACHE_PERSIST = False
+        # Measure the model only; lexicon answers would skew the timings
+        config.EMOTION_FAST_PATH = False
+
+        from core.emotion_analyzer import EmotionAnalyzer
+        analyzer = EmotionAnalyzer()
+        if not analyzer.load_model():
+            sys.exit(1)
+
+        # Warm-up so lazy initialisation is not attributed to the first case
+        analyzer.analyze_emotions_batch(synthetic_corpus(8, 16), batch_size=8)
+
+        cases = []
+        for threads in args.threads:
+            torch.set_num_threads(threads)
+            for words in args.lengths:
+                texts = synthetic_corpus(args.texts, words)
+                for batch_size in args.batch_sizes:
+                    result = run_case(analyzer, texts, batch_size, args.iterations)
+                    result.update({'threads': threads, 'words_per_text': words, 'batch_size': batch_size})
+                    cases.append(result)
+                    print(
+                        f"threads={threads:<3} words={words:<5} batch={batch_size:<4} "
+                        f"p50={result['latency_ms']['p50']:8.2f}ms p99={result['latency_ms']['p99']:8.2f}ms "
+                        f"{result['texts_per_second']:8.1f} texts/s",
+                        file=sys.stderr
+                    )
+
+    report = {
+        'timestamp': datetime.now().isoformat(),
+        'model': 'tiny-random-roberta' if args.tiny else config.EMOTION_MODEL,
+        'backend': analyzer.backend.name,
+        'tokenizer': type(analyzer.tokenizer).__name__,
+        'load_stats': analyzer.load_stats,
+        'environment': {
+            'python': platform.python_version(),
+            'torch': torch.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count()
+        },
+        'cases': cases
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Emotion insight latency as the history grows
+
+Fills an in-memory StatisticsManager with synthetic emotion entries (one every
+few minutes, newest at "now") and times get_emotion_insights at increasing
+history sizes, next to the previous approach of parsing every stored
+timestamp to filter by the cutoff. Nothing is written to the real data
+directory: the manager runs against a temporary one and entries are applied
+without persisting.
+
+Usage:
+    python benchmarks/bench_emotion_insights.py
+    python benchmarks/bench_emotion_insights.py --sizes 1000 10000 100000 --days 3 30 --output results.json
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+LABELS = ['joy', 'neutral', 'nervousness', 'sadness', 'gratitude', 'fear', 'optimism']
+
+
+def synthetic_entries(count: int, spacing_minutes: float, seed: int = 0):
+    """`count` chronologically ordered entries ending now"""
+    rng = random.Random(seed)
+    start = datetime.now() - timedelta(minutes=spacing_minutes * count)
+    for i in range(count):
+        yield {
+            'timestamp': (start + timedelta(minutes=spacing_minutes * (i + 1))).isoformat(),
+            'emotions': [],
+            'risk_score': rng.uniform(0, 100),
+            'primary_emotion': rng.choice(LABELS)
+        }
+
+
+def linear_scan_insights(history, days: int):
+    """The pre-index implementation: parse every timestamp, then summarise"""
+    cutoff_date = datetime.now() - timedelta(days=days)
+    recent = [e for e in history if datetime.fromisoformat(e['timestamp']) > cutoff_date]
+    if not recent:
+        return 0
+    return sum(e['risk_score'] for e in recent) / len(recent)
+
+
+def time_call(fn, repeats: int) -> float:
+    """Median milliseconds per call"""
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help="History sizes")
+    parser.add_argument('--days', type=int, nargs='+', default=[3, 7, 30], help="Insight windows")
+    parser.add_argument('--spacing-minutes', type=float, default=5.0, help="Minutes between entries")
+    parser.add_argument('--repeats', type=int, default=20, help="Timed calls per case")
+    parser.add_argument('--output', help="Write JSON results here instead of stdout")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        config.DATA_DIR = scratch
+        config.DAILY_SERIES_FILE = os.path.join(scratch, 'daily_seconds.npz')
+        config.SESSION_LOG_FILE = os.path.join(scratch, 'sessions.bin')
+        config.STORAGE_BACKEND = 'json'
+        # Keep every entry raw so the benchmark measures the index, not the rollups
+        config.EMOTION_RAW_MAX_ENTRIES = max(args.sizes)
+        config.EMOTION_RAW_RETENTION_DAYS = int(max(args.sizes) * args.spacing_minutes / 1440) + 2
+
+        from core.statistics_manager import StatisticsManager
+
+        cases = []
+        for size in sorted(args.sizes):
+            manager = StatisticsManager()
+            for entry in synthetic_entries(size, args.spacing_minutes):
+                manager._apply_event({'type': 'emotion_entry', 'entry': entry})
+            history = manager.data['emotion_history']
+
+            for days in args.days:
+                indexed_ms = time_call(lambda: manager.get_emotion_insights(days), args.repeats)
+                scan_ms = time_call(lambda: linear_scan_insights(history, days), max(1, args.repeats // 4))
+                in_window = manager.get_emotion_insights(days)['total_entries']
+                cases.append({
+                    'history_size': size,
+                    'days': days,
+                    'entries_in_window': in_window,
+                    'indexed_ms': indexed_ms,
+                    'linear_scan_ms': scan_ms
+                })
+                print(
+                    f"size={size:<7} days={days:<4} window={in_window:<6} "
+                    f"indexed={indexed_ms:8.3f}ms  scan={scan_ms:9.3f}ms",
+                    file=sys.stderr
+                )
+
+    report = {'timestamp': datetime.now().isoformat(), 'spacing_minutes': args.spacing_minutes, 'cases': cases}
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"✅ Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
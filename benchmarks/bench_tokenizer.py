@@ -0,0 +1,108 @@
+"""
+Micro-benchmark: tokenization and input-preparation overhead in analyze_emotion
+
+Compares the original path (pure-Python tokenizer, fresh tensors moved with
+.to(device) on every call) with the current one (fast tokenizer, reused input
+buffers) on short check-in texts, and reports how much of each call is spent
+before the model runs.
+
+Usage:
+    python benchmarks/bench_tokenizer.py [--model-path PATH] [--iterations N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+SAMPLE_TEXTS = [
+    "feeling great today",
+    "so stressed about the exam tomorrow",
+    "I can't focus and I keep worrying that I won't finish everything in time",
+    "had a good study session, proud of myself",
+    "tired and a bit sad, nothing is going right this week",
+    "excited to finally understand recursion!"
+]
+
+
+def time_legacy_path(analyzer, texts, iterations):
+    """Slow tokenizer, new tensors per call, then .to(device)"""
+    from transformers import RobertaTokenizer
+    tokenizer = RobertaTokenizer.from_pretrained(config.MODEL_PATH)
+
+    prepare, forward = [], []
+    for _ in range(iterations):
+        for text in texts:
+            start = time.perf_counter()
+            inputs = tokenizer(
+                text,
+                return_tensors="pt",
+                truncation=True,
+                padding=True,
+                max_length=config.EMOTION_MAX_LENGTH
+            ).to(analyzer.device)
+            middle = time.perf_counter()
+            analyzer._predict(inputs)
+            end = time.perf_counter()
+            prepare.append(middle - start)
+            forward.append(end - middle)
+    return prepare, forward
+
+
+def time_current_path(analyzer, texts, iterations):
+    """Fast tokenizer to plain id lists, copied into the preallocated buffers"""
+    prepare, forward = [], []
+    for _ in range(iterations):
+        for text in texts:
+            start = time.perf_counter()
+            token_ids = analyzer.tokenizer(
+                text,
+                truncation=True,
+                max_length=config.EMOTION_MAX_LENGTH,
+                verbose=False
+            )['input_ids']
+            inputs = analyzer._prepare_inputs(token_ids)
+            middle = time.perf_counter()
+            analyzer._predict(inputs)
+            end = time.perf_counter()
+            prepare.append(middle - start)
+            forward.append(end - middle)
+    return prepare, forward
+
+
+def summarize(name, prepare, forward):
+    prep_ms = statistics.median(prepare) * 1000
+    model_ms = statistics.median(forward) * 1000
+    share = prep_ms / (prep_ms + model_ms) * 100
+    print(f"{name:<10} tokenize+prepare {prep_ms:7.3f} ms | model {model_ms:8.3f} ms | overhead share {share:5.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--model-path', default=config.MODEL_PATH, help="Local model directory")
+    parser.add_argument('--iterations', type=int, default=50, help="Passes over the sample texts")
+    args = parser.parse_args()
+
+    config.MODEL_PATH = args.model_path
+    config.EMOTION_CACHE_SIZE = 0
+    config.EMOTION_CACHE_PERSIST = False
+
+    from core.emotion_analyzer import EmotionAnalyzer
+    analyzer = EmotionAnalyzer()
+    if not analyzer.load_model():
+        sys.exit(1)
+    print(f"Tokenizer: {type(analyzer.tokenizer).__name__}")
+
+    # Warm up both paths so one-off allocations are not measured
+    time_legacy_path(analyzer, SAMPLE_TEXTS, 1)
+    time_current_path(analyzer, SAMPLE_TEXTS, 1)
+
+    summarize("before", *time_legacy_path(analyzer, SAMPLE_TEXTS, args.iterations))
+    summarize("after", *time_current_path(analyzer, SAMPLE_TEXTS, args.iterations))
+
+
+if __name__ == "__main__":
+    main()
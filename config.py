@@ -26,6 +26,37 @@ for directory in [DATA_DIR, MODEL_DIR, RESOURCES_DIR, SOUNDS_DIR, IMAGES_DIR, TH
 # Model Settings
 EMOTION_MODEL = "SamLowe/roberta-base-go_emotions"
 MODEL_PATH = os.path.join(MODEL_DIR, "emotion_model")
+# Base name of the ONNX export; the weights fingerprint and torch version are added to it
+ONNX_MODEL_PATH = os.path.join(MODEL_DIR, "emotion_model.onnx")
+
+EMOTION_USE_FAST_TOKENIZER = True
+
+# Inference backend: "fp32" (eager PyTorch), "int8" (dynamic quantization), "onnx" (ONNX Runtime)
+# or "torchscript" (fp32 graph traced once and cached next to the safetensors weights)
+EMOTION_BACKEND = "fp32"
+EMOTION_BACKEND_RISK_TOLERANCE = 5.0
+
+# Long texts are scored as overlapping token windows instead of being truncated
+EMOTION_MAX_LENGTH = 512
+EMOTION_CHUNK_LONG_TEXT = True
+EMOTION_CHUNK_OVERLAP = 64
+EMOTION_CHUNK_BATCH_SIZE = 8
+
+# Short, unambiguous check-ins can be answered from a lexicon without running the model.
+# Off by default: every check-in is scored by the transformer unless this is enabled
+EMOTION_FAST_PATH = False
+FAST_PATH_MAX_WORDS = 8
+
+# Shared inference worker: requests arriving within the wait window share one forward pass
+INFERENCE_MAX_BATCH_SIZE = 16
+INFERENCE_MAX_WAIT_MS = 10
+
+# Emotion Result Cache
+EMOTION_CACHE_SIZE = 512
+EMOTION_CACHE_PERSIST = True
+# Files kept in the disk tier; the least recently used are evicted past this
+EMOTION_CACHE_DISK_MAX_ENTRIES = 5000
+EMOTION_CACHE_DIR = os.path.join(DATA_DIR, "emotion_cache")
 
 # Timer Settings
 DEFAULT_FOCUS_TIME = 25
@@ -86,6 +117,46 @@ MOTIVATIONAL_QUOTES = [
 DAILY_GOAL_DEFAULT = 120
 WEEKLY_GOAL_DEFAULT = 840
 STREAK_GOAL_DEFAULT = 7
+# A day counts toward a streak once this many seconds were studied
+STREAK_MIN_SECONDS = 600
+
+# Emotion insights over this many days are served from running aggregates
+STATS_ROLLING_WINDOW_DAYS = 7
+
+# Emotion history retention: raw entries for a recent window (at least the rolling
+# window above), then hourly rollups, then daily rollups
+EMOTION_RAW_RETENTION_DAYS = 14
+EMOTION_RAW_MAX_ENTRIES = 1000
+EMOTION_HOURLY_RETENTION_DAYS = 90
+EMOTION_DAILY_RETENTION_DAYS = 5 * 365
+
+# Per-day study seconds as a day-indexed NumPy array, saved next to the statistics
+DAILY_SERIES_FILE = os.path.join(DATA_DIR, "daily_seconds.npz")
+
+# One fixed-size binary record (start, end, seconds, phase) per timer session
+SESSION_LOG_FILE = os.path.join(DATA_DIR, "sessions.bin")
+
+# Exports stream this many rows at a time
+EXPORT_CHUNK_SIZE = 5000
+
+# Write-behind persistence for statistics and tasks: "immediate" (write on every
+# change), "debounced" (coalesce bursts, fsync on flush) or "relaxed" (no fsync)
+PERSIST_POLICY = "debounced"
+PERSIST_DEBOUNCE_SECONDS = 0.5
+PERSIST_MAX_DELAY_SECONDS = 5.0
+
+# Statistics persistence: mutations are appended to a JSONL log that is folded
+# into a fresh snapshot once it grows past a size or age limit
+EVENT_LOG_MAX_BYTES = 256 * 1024
+EVENT_LOG_MAX_AGE_SECONDS = 24 * 60 * 60
+
+# Storage backend for statistics and tasks: "json" (files in DATA_DIR) or "sqlite"
+# (one WAL-mode database; existing JSON data is imported on first start)
+STORAGE_BACKEND = "json"
+SQLITE_DB_FILE = os.path.join(DATA_DIR, "study.db")
+
+# Managers created with a user id keep that user's files in USERS_DIR/<user id>/
+USERS_DIR = os.path.join(DATA_DIR, "users")
 
 # UI Theme
 THEME_COLORS = {
@@ -6,5 +6,7 @@ from .emotion_analyzer import EmotionAnalyzer
 from .timer_manager import TimerManager
 from .statistics_manager import StatisticsManager
 from .task_manager import TaskManager
+from .inference_service import InferenceService, get_inference_service
 
-__all__ = ['EmotionAnalyzer', 'TimerManager', 'StatisticsManager', 'TaskManager']
\ No newline at end of file
+__all__ = ['EmotionAnalyzer', 'TimerManager', 'StatisticsManager', 'TaskManager',
+           'InferenceService', 'get_inference_service']
\ No newline at end of file
@@ -0,0 +1,158 @@
+"""
+Columnar Day-Indexed Time Series for Daily Study Seconds
+"""
+
+import os
+from datetime import date
+from typing import Dict, Tuple, Union
+import numpy as np
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+DayLike = Union[str, date, np.datetime64]
+
+def day_ordinal(day: DayLike) -> int:
+    """Days since 1970-01-01 for a 'YYYY-MM-DD' string, date or datetime64"""
+    return int(np.datetime64(day, 'D').astype(np.int64))
+
+class DailySeries:
+    """Study seconds and session counts per calendar day, in arrays indexed by day ordinal"""
+
+    def __init__(self, path: str = None):
+        self.path = path or config.DAILY_SERIES_FILE
+        self.origin = None
+        self.length = 0
+        self.seconds = np.zeros(0, dtype=np.int64)
+        # Days with a recorded session, so zero seconds differs from never studied
+        self.present = np.zeros(0, dtype=bool)
+        # Zero where the series was rebuilt from per-day totals and the count is unknown
+        self.sessions = np.zeros(0, dtype=np.int32)
+
+    # Building --------------------------------------------------------------
+
+    @classmethod
+    def from_dict(cls, daily_sessions: Dict[str, int], path: str = None) -> 'DailySeries':
+        series = cls(path)
+        if daily_sessions:
+            ordinals = np.array(list(daily_sessions.keys()), dtype='datetime64[D]').astype(np.int64)
+            values = np.fromiter(daily_sessions.values(), dtype=np.int64, count=len(daily_sessions))
+            series.origin = int(ordinals.min())
+            series.length = int(ordinals.max()) - series.origin + 1
+            series.seconds = np.zeros(series.length, dtype=np.int64)
+            series.present = np.zeros(series.length, dtype=bool)
+            series.sessions = np.zeros(series.length, dtype=np.int32)
+            np.add.at(series.seconds, ordinals - series.origin, values)
+            series.present[ordinals - series.origin] = True
+        return series
+
+    def add(self, day: DayLike, seconds: int, sessions: int = 1):
+        index = self._index_for(day_ordinal(day))
+        self.seconds[index] += seconds
+        self.present[index] = True
+        self.sessions[index] += sessions
+
+    def _index_for(self, ordinal: int) -> int:
+        if self.origin is None:
+            self.origin = ordinal
+        if ordinal < self.origin:
+            shift = self.origin - ordinal
+            self.seconds = np.concatenate([np.zeros(shift, dtype=np.int64), self.seconds])
+            self.present = np.concatenate([np.zeros(shift, dtype=bool), self.present])
+            self.sessions = np.concatenate([np.zeros(shift, dtype=np.int32), self.sessions])
+            self.origin = ordinal
+            self.length += shift
+
+        index = ordinal - self.origin
+        if index >= len(self.seconds):
+            capacity = max(index + 1, len(self.seconds) * 2, 64)
+            self.seconds = np.concatenate([self.seconds, np.zeros(capacity - len(self.seconds), dtype=np.int64)])
+            self.present = np.concatenate([self.present, np.zeros(capacity - len(self.present), dtype=bool)])
+            self.sessions = np.concatenate([self.sessions, np.zeros(capacity - len(self.sessions), dtype=np.int32)])
+        self.length = max(self.length, index + 1)
+        return index
+
+    # Queries ---------------------------------------------------------------
+
+    def get(self, day: DayLike) -> int:
+        index = self._offset(day_ordinal(day))
+        return int(self.seconds[index]) if 0 <= index < self.length else 0
+
+    def window(self, start: DayLike, end: DayLike) -> Tuple[np.ndarray, np.ndarray]:
+        """Dates (datetime64[D]) and seconds for every day in [start, end], zero-filled"""
+        start_ordinal, end_ordinal = day_ordinal(start), day_ordinal(end)
+        dates = np.arange(start_ordinal, end_ordinal + 1).astype('datetime64[D]')
+        values = np.zeros(len(dates), dtype=np.int64)
+        if self.origin is not None:
+            lo = max(start_ordinal, self.origin)
+            hi = min(end_ordinal, self.origin + self.length - 1)
+            if lo <= hi:
+                values[lo - start_ordinal:hi - start_ordinal + 1] = \
+                    self.seconds[lo - self.origin:hi - self.origin + 1]
+        return dates, values
+
+    def range_sum(self, start: DayLike, end: DayLike) -> int:
+        """Total seconds over the inclusive range [start, end]"""
+        if self.origin is None:
+            return 0
+        lo = max(self._offset(day_ordinal(start)), 0)
+        hi = min(self._offset(day_ordinal(end)), self.length - 1)
+        return int(self.seconds[lo:hi + 1].sum()) if lo <= hi else 0
+
+    def rolling_sum(self, start: DayLike, end: DayLike, window_days: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Trailing `window_days` totals for every day in [start, end]"""
+        start_ordinal = day_ordinal(start)
+        _, values = self.window(np.datetime64(start_ordinal - window_days + 1, 'D'), end)
+        cumulative = np.concatenate([[0], np.cumsum(values)])
+        totals = cumulative[window_days:] - cumulative[:-window_days]
+        dates = np.arange(start_ordinal, start_ordinal + len(totals)).astype('datetime64[D]')
+        return dates, totals
+
+    def recorded_days(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Dates, seconds and session counts of every day with a recorded session, in date order"""
+        if self.origin is None:
+            return (np.array([], dtype='datetime64[D]'), np.array([], dtype=np.int64),
+                    np.array([], dtype=np.int32))
+        offsets = np.flatnonzero(self.present[:self.length])
+        return (offsets + self.origin).astype('datetime64[D]'), self.seconds[offsets], self.sessions[offsets]
+
+    def total(self) -> int:
+        return int(self.seconds[:self.length].sum())
+
+    def day_count(self) -> int:
+        return int(np.count_nonzero(self.present[:self.length]))
+
+    def _offset(self, ordinal: int) -> int:
+        return ordinal - self.origin if self.origin is not None else -1
+
+    # Persistence -------------------------------------------------------------
+
+    def save(self, fsync: bool = False):
+        """Atomically write the used part of the arrays as a compressed .npz"""
+        tmp_file = f"{self.path}.{os.getpid()}.tmp.npz"
+        with open(tmp_file, 'wb') as f:
+            np.savez_compressed(
+                f,
+                origin=np.int64(self.origin if self.origin is not None else 0),
+                has_origin=np.bool_(self.origin is not None),
+                seconds=self.seconds[:self.length],
+                present=self.present[:self.length],
+                sessions=self.sessions[:self.length]
+            )
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_file, self.path)
+
+    @classmethod
+    def load(cls, path: str = None) -> 'DailySeries':
+        series = cls(path)
+        with np.load(series.path) as stored:
+            if bool(stored['has_origin']):
+                series.origin = int(stored['origin'])
+                series.seconds = stored['seconds'].astype(np.int64)
+                series.present = stored['present'].astype(bool)
+                series.length = len(series.seconds)
+                series.sessions = (stored['sessions'].astype(np.int32) if 'sessions' in stored.files
+                                   else np.zeros(series.length, dtype=np.int32))
+        return series
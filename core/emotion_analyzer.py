@@ -1,52 +1,169 @@
-<<<<<<< HEAD
 """
 AI-Powered Emotion Analysis Engine
 """
 
-import torch
-from transformers import RobertaTokenizer, RobertaForSequenceClassification
-import numpy as np
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Iterator, Tuple
 import os
 import sys
+import threading
+import time
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from .emotion_cache import EmotionCache
+from .fast_path import LexiconClassifier
+
+# torch and transformers are imported inside the methods that need them, so
+# importing this module (and the core package) stays cheap until a model loads.
+if TYPE_CHECKING:
+    import torch
 
 class EmotionAnalyzer:
     def __init__(self):
-        self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+        self.device = None
         self.model = None
         self.tokenizer = None
+        self.backend = None
+        self.load_stats = None
         self.emotion_labels = list(config.EMOTION_RISK_MAP.keys())
         self.is_loaded = False
+        self.cache = EmotionCache(model_id=f"{config.EMOTION_MODEL}@{config.EMOTION_BACKEND}")
+        self.fast_path = LexiconClassifier() if config.EMOTION_FAST_PATH else None
+        
+        self.load_status = 'not_loaded'
+        self.load_error = None
+        self._load_thread = None
+        self._load_lock = threading.Lock()
+        self._input_buffers = threading.local()
         
     def load_model(self):
         """Load or download the emotion detection model"""
+        with self._load_lock:
+            if self.is_loaded:
+                return True
+            self.load_status = 'loading'
+            self.load_error = None
+            
+            loaded = self._load_model()
+            self.load_status = 'ready' if loaded else 'failed'
+            return loaded
+    
+    def load_model_async(self) -> threading.Thread:
+        """Start loading the model on a background thread (no-op if already started)"""
+        with self._load_lock:
+            if self.is_loaded or (self._load_thread and self._load_thread.is_alive()):
+                return self._load_thread
+            self.load_status = 'loading'
+            self._load_thread = threading.Thread(
+                target=self.load_model,
+                name='emotion-model-loader',
+                daemon=True
+            )
+            self._load_thread.start()
+            return self._load_thread
+    
+    def wait_until_loaded(self, timeout: Optional[float] = None) -> bool:
+        """Block until a background load finishes; returns whether the model is ready"""
+        if self._load_thread:
+            self._load_thread.join(timeout)
+        return self.is_loaded
+    
+    def get_load_status(self) -> Dict[str, Any]:
+        """Get the model loading state: not_loaded, loading, ready or failed"""
+        return {
+            'status': self.load_status,
+            'error': self.load_error,
+            'backend': self.backend.name if self.backend else None,
+            'load_stats': self.load_stats
+        }
+    
+    def _load_model(self) -> bool:
+        """Read the tokenizer and weights, then start the configured backend"""
         try:
+            started = time.perf_counter()
+            import torch
+            from transformers import AutoConfig, RobertaForSequenceClassification
+            from .inference_backends import TorchBackend, create_backend
+            from .model_artifacts import ensure_safetensors, traced_graph_path
+            imported = time.perf_counter()
+            
+            self.device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+            cold_start = False
+            
             if os.path.exists(config.MODEL_PATH):
                 print("📦 Loading local model...")
-                self.tokenizer = RobertaTokenizer.from_pretrained(config.MODEL_PATH)
-                self.model = RobertaForSequenceClassification.from_pretrained(config.MODEL_PATH)
+                self.tokenizer = self._load_tokenizer(config.MODEL_PATH)
+                
+                traced_path = None
+                if config.EMOTION_BACKEND == 'torchscript':
+                    traced_path = traced_graph_path(config.MODEL_PATH)
+                
+                if traced_path and os.path.exists(traced_path):
+                    # The cached graph carries its own weights, so the checkpoint is not deserialized
+                    self.model = None
+                else:
+                    self.model = RobertaForSequenceClassification.from_pretrained(config.MODEL_PATH)
+                    cold_start = ensure_safetensors(self.model, config.MODEL_PATH)
             else:
                 print("🌐 Downloading model from Hugging Face...")
                 print("⏳ This may take 2-3 minutes on first run...")
-                self.tokenizer = RobertaTokenizer.from_pretrained(config.EMOTION_MODEL)
+                self.tokenizer = self._load_tokenizer(config.EMOTION_MODEL)
                 self.model = RobertaForSequenceClassification.from_pretrained(config.EMOTION_MODEL)
                 
                 os.makedirs(config.MODEL_PATH, exist_ok=True)
                 self.tokenizer.save_pretrained(config.MODEL_PATH)
-                self.model.save_pretrained(config.MODEL_PATH)
+                self.model.save_pretrained(config.MODEL_PATH, safe_serialization=True)
                 print("✅ Model saved locally!")
+                cold_start = True
+            
+            if self.model is not None:
+                self.model.to(self.device)
+                self.model.eval()
+                self._compile_label_metadata(self.model.config.id2label)
+            else:
+                self._compile_label_metadata(AutoConfig.from_pretrained(config.MODEL_PATH).id2label)
+            
+            self.backend = create_backend(config.EMOTION_BACKEND, self.model, self.device)
+            if isinstance(self.backend, TorchBackend) and self.backend.model is None:
+                # The cached graph could not be used; fall back to the eager checkpoint
+                self.model = RobertaForSequenceClassification.from_pretrained(config.MODEL_PATH).eval()
+                self.backend = TorchBackend(self.model.to(self.device), self.device)
+            cold_start = cold_start or getattr(self.backend, 'graph_built', False)
+            
+            self.model = getattr(self.backend, 'model', None)
+            self.device = self.backend.device
+            self._input_buffers = threading.local()
+            print(f"⚙️ Inference backend: {self.backend.name}")
+            
+            self.load_stats = {
+                'seconds': time.perf_counter() - started,
+                'import_seconds': imported - started,
+                'start': 'cold' if cold_start else 'warm',
+                'backend': self.backend.name
+            }
+            print(f"⏱️ Model ready in {self.load_stats['seconds']:.2f}s "
+                  f"({self.load_stats['start']} start, {self.load_stats['import_seconds']:.2f}s importing)")
             
-            self.model.to(self.device)
-            self.model.eval()
             self.is_loaded = True
             return True
             
         except Exception as e:
             print(f"❌ Error loading model: {e}")
+            self.load_error = str(e)
             return False
     
+    def _load_tokenizer(self, source: str):
+        """Prefer the Rust-backed fast tokenizer, falling back to the pure-Python one"""
+        from transformers import RobertaTokenizer
+        
+        if config.EMOTION_USE_FAST_TOKENIZER:
+            try:
+                from transformers import RobertaTokenizerFast
+                return RobertaTokenizerFast.from_pretrained(source)
+            except Exception as e:
+                print(f"⚠️ Fast tokenizer unavailable ({e}), using the Python tokenizer")
+        
+        return RobertaTokenizer.from_pretrained(source)
+    
     def clean_text(self, text: str) -> str:
         """Clean and preprocess text"""
         if not text or text.strip() == "":
@@ -62,43 +179,377 @@ class EmotionAnalyzer:
         if not text:
             return None
         
-        inputs = self.tokenizer(
+        fast_result = self._fast_path_result(text, top_k)
+        if fast_result is not None:
+            return fast_result
+        
+        cache_key = self.cache.make_key(text, top_k)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        token_ids = self.tokenizer(
             text,
-            return_tensors="pt",
-            truncation=True,
-            padding=True,
-            max_length=512
-        ).to(self.device)
+            truncation=not config.EMOTION_CHUNK_LONG_TEXT,
+            max_length=config.EMOTION_MAX_LENGTH,
+            verbose=False
+        )['input_ids']
         
-        with torch.no_grad():
-            outputs = self.model(**inputs)
-            predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
+        if len(token_ids) > config.EMOTION_MAX_LENGTH:
+            result = self._analyze_token_windows(self._strip_special_tokens(token_ids), top_k)
+        else:
+            predictions = self._predict(self._prepare_inputs(token_ids))
+            result = self._build_result(predictions[0], top_k)
         
-        top_probs, top_indices = torch.topk(predictions[0], k=min(top_k, len(self.emotion_labels)))
+        self.cache.put(cache_key, result)
+        return result
+    
+    def analyze_emotion_chunked(self, text: str, top_k: int = 5, overlap: int = None,
+                                batch_size: int = None) -> Dict[str, Any]:
+        """Analyze a long text as overlapping token windows, weighting each window by its length"""
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
         
-        emotions = []
-        for prob, idx in zip(top_probs, top_indices):
-            emotion_name = self.emotion_labels[idx.item()]
-            emotion_info = config.EMOTION_RISK_MAP.get(emotion_name, {})
+        text = self.clean_text(text)
+        if not text:
+            return None
+        
+        token_ids = self.tokenizer(text, add_special_tokens=False, verbose=False)['input_ids']
+        return self._analyze_token_windows(token_ids, top_k, overlap, batch_size)
+    
+    def iter_emotion_chunks(self, text: str, top_k: int = 5, overlap: int = None,
+                            batch_size: int = None) -> Iterator[Dict[str, Any]]:
+        """Yield each window's result, plus the running aggregate, as soon as its batch is scored"""
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
+        
+        text = self.clean_text(text)
+        if not text:
+            return
+        
+        token_ids = self.tokenizer(text, add_special_tokens=False, verbose=False)['input_ids']
+        spans = self._window_spans(len(token_ids), overlap)
+        
+        weighted_sum = None
+        total_weight = 0
+        for index, (start, end, probabilities) in enumerate(self._iter_window_predictions(token_ids, spans, batch_size)):
+            weight = end - start
+            weighted_sum = probabilities * weight if weighted_sum is None else weighted_sum + probabilities * weight
+            total_weight += weight
             
-            emotions.append({
-                'emotion': emotion_name,
-                'confidence': float(prob.item()),
-                'risk_level': emotion_info.get('risk', 'low'),
-                'concern': emotion_info.get('concern', 'unknown'),
-                'color': emotion_info.get('color', '#6b7280')
-            })
+            yield {
+                'chunk': index,
+                'total_chunks': len(spans),
+                'token_start': start,
+                'token_end': end,
+                'result': self._build_result(probabilities, top_k),
+                'aggregate': self._build_result(weighted_sum / total_weight, top_k)
+            }
+    
+    def analyze_emotions_batch(self, texts: List[str], top_k: int = 5, batch_size: int = 16) -> List[Dict[str, Any]]:
+        """Analyze many texts at once, padding each batch only to its longest member"""
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
         
-        risk_score = self.calculate_risk_score(emotions)
-        recommendation = self.generate_recommendation(risk_score, emotions)
+        results = [None] * len(texts)
+        cleaned = [self.clean_text(text) for text in texts]
+        cache_keys = [self.cache.make_key(text, top_k) if text else None for text in cleaned]
+        
+        indices = []
+        for i, text in enumerate(cleaned):
+            if not text:
+                continue
+            fast_result = self._fast_path_result(text, top_k)
+            if fast_result is not None:
+                results[i] = fast_result
+                continue
+            cached = self.cache.get(cache_keys[i])
+            if cached is not None:
+                results[i] = cached
+            else:
+                indices.append(i)
+        
+        if not indices:
+            return results
+        
+        computed = self._run_batches([cleaned[i] for i in indices], top_k, batch_size, self.backend)
+        for i, result in zip(indices, computed):
+            results[i] = result
+            self.cache.put(cache_keys[i], result)
+        
+        return results
+    
+    def get_cascade_stats(self) -> Dict[str, Any]:
+        """Get how many texts the lexicon fast path answered versus passed to the transformer"""
+        if self.fast_path is None:
+            return {'enabled': False, 'attempts': 0, 'hits': 0, 'deferred': 0, 'hit_rate': 0.0}
+        return {'enabled': True, **self.fast_path.get_stats()}
+    
+    def _fast_path_result(self, text: str, top_k: int) -> Optional[Dict[str, Any]]:
+        """Answer clear-cut short texts from the lexicon without running the model"""
+        if self.fast_path is None:
+            return None
         
+        emotions = self.fast_path.classify(text)
+        if emotions is None:
+            return None
+        
+        emotions = emotions[:top_k]
+        risk_score = self.calculate_risk_score(emotions)
         return {
             'emotions': emotions,
             'risk_score': risk_score,
-            'recommendation': recommendation,
-            'primary_emotion': emotions[0] if emotions else None
+            'recommendation': self.generate_recommendation(risk_score, emotions),
+            'primary_emotion': emotions[0] if emotions else None,
+            'stage': 'lexicon'
         }
     
+    def check_backend_agreement(self, texts: List[str], top_k: int = 5) -> Dict[str, Any]:
+        """Compare the active backend against eager fp32 on top-k labels and risk score"""
+        if not self.is_loaded:
+            raise RuntimeError("Model not loaded. Call load_model() first.")
+        
+        cleaned = [t for t in (self.clean_text(text) for text in texts) if t]
+        if not cleaned:
+            raise ValueError("No non-empty texts to compare.")
+        
+        import torch
+        from transformers import RobertaForSequenceClassification
+        from .inference_backends import TorchBackend
+        
+        reference_model = RobertaForSequenceClassification.from_pretrained(config.MODEL_PATH)
+        reference_model.eval()
+        reference = TorchBackend(reference_model, torch.device('cpu'))
+        
+        expected = self._run_batches(cleaned, top_k, 16, reference)
+        actual = self._run_batches(cleaned, top_k, 16, self.backend)
+        
+        label_matches = 0
+        primary_matches = 0
+        risk_diffs = []
+        for ref, res in zip(expected, actual):
+            if [e['emotion'] for e in ref['emotions']] == [e['emotion'] for e in res['emotions']]:
+                label_matches += 1
+            if ref['primary_emotion']['emotion'] == res['primary_emotion']['emotion']:
+                primary_matches += 1
+            risk_diffs.append(abs(ref['risk_score'] - res['risk_score']))
+        
+        max_risk_diff = max(risk_diffs)
+        return {
+            'backend': self.backend.name,
+            'texts': len(cleaned),
+            'top_k_agreement': label_matches / len(cleaned),
+            'primary_agreement': primary_matches / len(cleaned),
+            'max_risk_diff': max_risk_diff,
+            'mean_risk_diff': sum(risk_diffs) / len(risk_diffs),
+            'passed': primary_matches == len(cleaned) and max_risk_diff <= config.EMOTION_BACKEND_RISK_TOLERANCE
+        }
+    
+    def _run_batches(self, texts: List[str], top_k: int, batch_size: int, backend) -> List[Dict[str, Any]]:
+        """Score cleaned, non-empty texts in length-sorted batches on the given backend"""
+        results = [None] * len(texts)
+        encoded = self.tokenizer(
+            texts,
+            truncation=not config.EMOTION_CHUNK_LONG_TEXT,
+            max_length=config.EMOTION_MAX_LENGTH,
+            verbose=False
+        )
+        
+        # Texts that do not fit in one window are scored chunk by chunk
+        fitting = []
+        for j, input_ids in enumerate(encoded['input_ids']):
+            if len(input_ids) > config.EMOTION_MAX_LENGTH:
+                results[j] = self._analyze_token_windows(self._strip_special_tokens(input_ids), top_k, backend=backend)
+            else:
+                fitting.append(j)
+        
+        # Sort by token length so that similar lengths share a batch
+        order = sorted(fitting, key=lambda j: len(encoded['input_ids'][j]))
+        
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            inputs = self.tokenizer.pad(
+                {
+                    'input_ids': [encoded['input_ids'][j] for j in bucket],
+                    'attention_mask': [encoded['attention_mask'][j] for j in bucket]
+                },
+                padding='longest',
+                return_tensors="pt"
+            ).to(backend.device)
+            
+            predictions = self._predict(inputs, backend)
+            
+            for j, result in zip(bucket, self._build_results(predictions, top_k)):
+                results[j] = result
+        
+        return results
+    
+    def _analyze_token_windows(self, token_ids: List[int], top_k: int, overlap: int = None,
+                               batch_size: int = None, backend=None) -> Dict[str, Any]:
+        """Length-weighted average of window probabilities, accumulated batch by batch"""
+        spans = self._window_spans(len(token_ids), overlap)
+        
+        weighted_sum = None
+        total_weight = 0
+        for start, end, probabilities in self._iter_window_predictions(token_ids, spans, batch_size, backend):
+            weight = end - start
+            weighted_sum = probabilities * weight if weighted_sum is None else weighted_sum + probabilities * weight
+            total_weight += weight
+        
+        return self._build_result(weighted_sum / total_weight, top_k)
+    
+    def _window_spans(self, num_tokens: int, overlap: int = None) -> List[Tuple[int, int]]:
+        """Split a token range into windows that fit the model, overlapping by `overlap` tokens"""
+        overlap = config.EMOTION_CHUNK_OVERLAP if overlap is None else overlap
+        body = config.EMOTION_MAX_LENGTH - 2  # room for <s> and </s>
+        step = max(1, body - overlap)
+        
+        spans = []
+        start = 0
+        while True:
+            end = min(start + body, num_tokens)
+            spans.append((start, end))
+            if end >= num_tokens:
+                break
+            start += step
+        return spans
+    
+    def _iter_window_predictions(self, token_ids: List[int], spans: List[Tuple[int, int]],
+                                 batch_size: int = None, backend=None):
+        """Score windows in fixed-size batches so memory stays bounded for any text length"""
+        backend = backend or self.backend
+        batch_size = batch_size or config.EMOTION_CHUNK_BATCH_SIZE
+        
+        for batch_start in range(0, len(spans), batch_size):
+            batch_spans = spans[batch_start:batch_start + batch_size]
+            inputs = self.tokenizer.pad(
+                {'input_ids': [
+                    self._add_special_tokens(token_ids[start:end])
+                    for start, end in batch_spans
+                ]},
+                padding='longest',
+                return_tensors="pt"
+            ).to(backend.device)
+            
+            predictions = self._predict(inputs, backend)
+            
+            for row, (start, end) in enumerate(batch_spans):
+                yield start, end, predictions[row]
+    
+    def _prepare_inputs(self, token_ids: List[int]) -> Dict[str, Any]:
+        """Write one sequence into this thread's reused input buffers and return views of them"""
+        import torch
+        
+        buffers = getattr(self._input_buffers, 'tensors', None)
+        if buffers is None:
+            shape = (1, config.EMOTION_MAX_LENGTH)
+            # Host-side staging tensor; on CPU it is the model input itself
+            staging = torch.zeros(shape, dtype=torch.long, pin_memory=self.device.type == 'cuda')
+            input_ids = staging if self.device.type == 'cpu' else torch.zeros(shape, dtype=torch.long, device=self.device)
+            buffers = (
+                staging.numpy(),
+                staging,
+                input_ids,
+                torch.ones(shape, dtype=torch.long, device=self.device)
+            )
+            self._input_buffers.tensors = buffers
+        
+        staging_array, staging, input_ids, attention_mask = buffers
+        length = len(token_ids)
+        # NumPy writes the ids straight into the shared memory, with no temporary tensor
+        staging_array[0, :length] = token_ids
+        if input_ids is not staging:
+            input_ids[:, :length].copy_(staging[:, :length])
+        
+        # A single sequence needs no padding, so the mask is all ones and both are plain views
+        return {
+            'input_ids': input_ids[:, :length],
+            'attention_mask': attention_mask[:, :length]
+        }
+    
+    def _add_special_tokens(self, token_ids: List[int]) -> List[int]:
+        """Wrap a window in the <s> ... </s> pair RoBERTa expects around a single sequence"""
+        return [self.tokenizer.cls_token_id] + token_ids + [self.tokenizer.sep_token_id]
+    
+    def _strip_special_tokens(self, input_ids: List[int]) -> List[int]:
+        """Drop the <s> ... </s> wrapper that RoBERTa adds around a single sequence"""
+        return input_ids[1:-1]
+    
+    def _predict(self, inputs, backend=None) -> 'torch.Tensor':
+        """Run the model and return class probabilities"""
+        import torch
+        
+        backend = backend or self.backend
+        logits = backend(inputs)
+        return torch.nn.functional.softmax(logits, dim=-1)
+    
+    def _build_result(self, probabilities: 'torch.Tensor', top_k: int) -> Dict[str, Any]:
+        """Turn one row of class probabilities into an analysis result"""
+        return self._build_results(probabilities.unsqueeze(0), top_k)[0]
+    
+    def _build_results(self, probabilities: 'torch.Tensor', top_k: int) -> List[Dict[str, Any]]:
+        """Turn a batch of probability rows into analysis results with one top-k and one risk pass"""
+        top_probs, top_indices, risk_scores = self._score_top_k(probabilities, top_k)
+        
+        results = []
+        for probs, indices, risk_score in zip(top_probs.tolist(), top_indices.tolist(), risk_scores.tolist()):
+            emotions = [
+                {'emotion': self.emotion_labels[idx], 'confidence': prob, **self._label_details[idx]}
+                for prob, idx in zip(probs, indices)
+            ]
+            
+            results.append({
+                'emotions': emotions,
+                'risk_score': risk_score,
+                'recommendation': self.generate_recommendation(risk_score, emotions),
+                'primary_emotion': emotions[0] if emotions else None,
+                'stage': 'transformer'
+            })
+        
+        return results
+    
+    def calculate_risk_scores(self, probabilities: 'torch.Tensor', top_k: int = 5) -> 'torch.Tensor':
+        """Risk scores (0-100) for a batch of probability rows, computed over each row's top-k emotions"""
+        return self._score_top_k(probabilities, top_k)[2]
+    
+    def _score_top_k(self, probabilities: 'torch.Tensor', top_k: int):
+        """Top-k probabilities, label ids and risk scores for every row as tensor operations"""
+        import torch
+        
+        top_probs, top_indices = torch.topk(probabilities, k=min(top_k, len(self.emotion_labels)), dim=-1)
+        top_probs = top_probs.float()
+        
+        weights = self._risk_weights.to(top_probs.device)[top_indices]
+        total_score = (weights * top_probs).sum(dim=-1)
+        max_score = self._max_risk_weight * top_probs.sum(dim=-1)
+        
+        risk_scores = torch.where(
+            max_score > 0,
+            total_score / max_score.clamp_min(1e-12) * 100,
+            torch.zeros_like(max_score)
+        )
+        return top_probs, top_indices, risk_scores
+    
+    def _compile_label_metadata(self, id2label: Dict[int, str]):
+        """Align label names, display details and risk weights with the model's output ids"""
+        import torch
+        
+        self.emotion_labels = [id2label[i] for i in range(len(id2label))]
+        self._label_details = []
+        weights = []
+        for emotion_name in self.emotion_labels:
+            emotion_info = config.EMOTION_RISK_MAP.get(emotion_name, {})
+            risk_level = emotion_info.get('risk', 'low')
+            self._label_details.append({
+                'risk_level': risk_level,
+                'concern': emotion_info.get('concern', 'unknown'),
+                'color': emotion_info.get('color', '#6b7280')
+            })
+            weights.append(config.RISK_WEIGHTS[risk_level])
+        
+        self._risk_weights = torch.tensor(weights, dtype=torch.float32)
+        self._max_risk_weight = float(config.RISK_WEIGHTS['high'])
+    
     def calculate_risk_score(self, emotions: List[Dict]) -> float:
         """Calculate overall mental health risk score (0-100)"""
         if not emotions:
@@ -165,6 +616,3 @@ You're in a great emotional state! Keep:
             return min(60, int(current_duration * 1.2))
         else:
             return current_duration
-=======
-
->>>>>>> 6016f1ed5b98e59f92aab31ec076f93a5d93cd69
@@ -0,0 +1,188 @@
+"""
+Content-Addressed Cache for Emotion Analysis Results
+"""
+
+import copy
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+class EmotionCache:
+    def __init__(self, model_id: str = None, max_entries: int = None, persist: bool = None, cache_dir: str = None,
+                 max_disk_entries: int = None):
+        self.model_id = model_id or config.EMOTION_MODEL
+        self.max_entries = max_entries if max_entries is not None else config.EMOTION_CACHE_SIZE
+        self.persist = persist if persist is not None else config.EMOTION_CACHE_PERSIST
+        self.cache_dir = cache_dir or config.EMOTION_CACHE_DIR
+        self.max_disk_entries = (max_disk_entries if max_disk_entries is not None
+                                 else config.EMOTION_CACHE_DISK_MAX_ENTRIES)
+        self.memory = OrderedDict()
+        self.disk_entries = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.disk_evictions = 0
+
+        if self.persist:
+            self._prepare_disk_store()
+
+    def make_key(self, clean_text: str, top_k: int) -> str:
+        """Build the cache key for an already cleaned text"""
+        payload = f"{self.model_id}\x00{top_k}\x00{clean_text}"
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a cached result, promoting disk hits into memory"""
+        with self._lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(self.memory[key])
+
+        if self.persist:
+            result = self._read_disk(key)
+            if result is not None:
+                self._remember(key, result)
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                return copy.deepcopy(result)
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, result: Dict[str, Any]):
+        """Store a result in memory and, if enabled, on disk"""
+        if result is None:
+            return
+
+        result = copy.deepcopy(result)
+        self._remember(key, result)
+
+        if self.persist:
+            self._write_disk(key, result)
+
+    def clear(self):
+        """Drop every cached result"""
+        with self._lock:
+            self.memory.clear()
+            self.disk_entries = 0
+        if self.persist and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json') and name != 'model.json':
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': (self.hits / lookups) * 100 if lookups else 0.0,
+            'entries': len(self.memory),
+            'disk_entries': self.disk_entries,
+            'disk_evictions': self.disk_evictions
+        }
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        """Insert into the in-memory LRU, evicting the oldest entry when full"""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self.memory[key] = result
+            self.memory.move_to_end(key)
+            while len(self.memory) > self.max_entries:
+                self.memory.popitem(last=False)
+
+    def _prepare_disk_store(self):
+        """Create the disk store and wipe it if it belongs to another model"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        meta_file = os.path.join(self.cache_dir, "model.json")
+
+        stored_model = None
+        if os.path.exists(meta_file):
+            try:
+                with open(meta_file, 'r') as f:
+                    stored_model = json.load(f).get('model')
+            except:
+                pass
+
+        if stored_model != self.model_id:
+            self.clear()
+            with open(meta_file, 'w') as f:
+                json.dump({'model': self.model_id}, f)
+
+        self.disk_entries = len(self._disk_files())
+        if self.disk_entries > self.max_disk_entries:
+            self._evict_disk()
+
+    def _disk_files(self):
+        return [name for name in os.listdir(self.cache_dir) if name.endswith('.json') and name != 'model.json']
+
+    def _evict_disk(self):
+        """Delete the least recently used files until the disk tier is back to 90% of its cap"""
+        entries = []
+        for name in self._disk_files():
+            path = os.path.join(self.cache_dir, name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except OSError:
+                pass
+        entries.sort()
+
+        # Evict a tenth at a time so a full cache does not rescan the directory on every write
+        excess = len(entries) - int(self.max_disk_entries * 0.9)
+        for _, path in entries[:max(excess, 0)]:
+            try:
+                os.remove(path)
+                self.disk_evictions += 1
+            except OSError:
+                pass
+        self.disk_entries = len(entries) - max(excess, 0)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                result = json.load(f)
+            # The file's mtime is its last use, which eviction goes by
+            os.utime(path)
+            return result
+        except:
+            return None
+
+    def _write_disk(self, key: str, result: Dict[str, Any]):
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            is_new = not os.path.exists(path)
+            with open(tmp_path, 'w') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing emotion cache: {e}")
+            return
+
+        if is_new:
+            with self._lock:
+                self.disk_entries += 1
+                if self.disk_entries > self.max_disk_entries:
+                    self._evict_disk()
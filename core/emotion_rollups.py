@@ -0,0 +1,126 @@
+"""
+Tiered Retention for Emotion History
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, List, Any
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+HOUR = timedelta(hours=1)
+DAY = timedelta(days=1)
+
+class EmotionRollups:
+    """Folds aged-out emotion entries into hourly, then daily, buckets of the statistics data"""
+
+    def __init__(self, rollups: Dict):
+        self.rollups = rollups
+        self.rollups.setdefault('hourly', [])
+        self.rollups.setdefault('daily', [])
+
+    @property
+    def hourly(self) -> List[Dict]:
+        return self.rollups['hourly']
+
+    @property
+    def daily(self) -> List[Dict]:
+        return self.rollups['daily']
+
+    def age_out(self, history: List[Dict], now: datetime = None) -> List[Dict]:
+        """Fold expired raw entries and buckets into the next tier; returns the raw entries kept"""
+        now = now or datetime.now()
+        raw_cutoff = (now - timedelta(days=config.EMOTION_RAW_RETENTION_DAYS)).isoformat()
+
+        expired = 0
+        overflow = len(history) - config.EMOTION_RAW_MAX_ENTRIES
+        while expired < len(history) and (expired < overflow or history[expired]['timestamp'] <= raw_cutoff):
+            entry = history[expired]
+            moment = datetime.fromisoformat(entry['timestamp'])
+            self._merge(self.hourly, moment.replace(minute=0, second=0, microsecond=0), 1,
+                        entry['risk_score'], entry['risk_score'], {entry['primary_emotion'] or 'neutral': 1})
+            expired += 1
+
+        hourly_cutoff = now - timedelta(days=config.EMOTION_HOURLY_RETENTION_DAYS)
+        while self.hourly and datetime.fromisoformat(self.hourly[0]['start']) + HOUR <= hourly_cutoff:
+            bucket = self.hourly.pop(0)
+            start = datetime.fromisoformat(bucket['start'])
+            self._merge(self.daily, start.replace(hour=0), bucket['count'],
+                        bucket['risk_sum'], bucket['risk_max'], bucket['labels'])
+
+        daily_cutoff = now - timedelta(days=config.EMOTION_DAILY_RETENTION_DAYS)
+        while self.daily and datetime.fromisoformat(self.daily[0]['start']) + DAY <= daily_cutoff:
+            self.daily.pop(0)
+
+        return history[expired:] if expired else history
+
+    def buckets_since(self, cutoff: datetime) -> List[Dict]:
+        """Daily then hourly buckets that end after the cutoff, oldest first"""
+        # ISO timestamps order lexicographically, so compare strings instead of parsing
+        daily_after = (cutoff - DAY).isoformat()
+        hourly_after = (cutoff - HOUR).isoformat()
+        return (
+            [b for b in self.daily if b['start'] > daily_after]
+            + [b for b in self.hourly if b['start'] > hourly_after]
+        )
+
+    @staticmethod
+    def summarize(buckets: List[Dict], entries: List[Dict]) -> Dict[str, Any]:
+        """
+        Summary over rolled-up buckets followed by raw entries, in time order.
+        The half averages split by entry count; a bucket straddling the middle
+        contributes its mean risk for the entries on each side.
+        """
+        units = [(b['count'], b['risk_sum']) for b in buckets]
+        units.extend((1, e['risk_score']) for e in entries)
+
+        count = sum(n for n, _ in units)
+        if not count:
+            return {'count': 0}
+
+        label_counts = {}
+        for bucket in buckets:
+            for label, n in bucket['labels'].items():
+                label_counts[label] = label_counts.get(label, 0) + n
+        for entry in entries:
+            label = entry['primary_emotion'] or 'neutral'
+            label_counts[label] = label_counts.get(label, 0) + 1
+
+        risk_total = sum(risk for _, risk in units)
+        summary = {
+            'count': count,
+            'average_risk': risk_total / count,
+            'max_risk': max([b['risk_max'] for b in buckets] + [e['risk_score'] for e in entries]),
+            'most_common_emotion': max(label_counts, key=label_counts.get)
+        }
+
+        half = count // 2
+        if half:
+            first_half_sum = 0.0
+            remaining = half
+            for n, risk in units:
+                if remaining <= 0:
+                    break
+                taken = min(n, remaining)
+                first_half_sum += risk * taken / n
+                remaining -= taken
+            summary['first_half_risk'] = first_half_sum / half
+            summary['second_half_risk'] = (risk_total - first_half_sum) / half
+        return summary
+
+    @staticmethod
+    def _merge(tier: List[Dict], start: datetime, count: int, risk_sum: float, risk_max: float, labels: Dict):
+        """Add to the newest bucket of a tier, or open a new one; inputs arrive in time order"""
+        start_str = start.isoformat()
+        if tier and tier[-1]['start'] == start_str:
+            bucket = tier[-1]
+        else:
+            bucket = {'start': start_str, 'count': 0, 'risk_sum': 0.0, 'risk_max': risk_max, 'labels': {}}
+            tier.append(bucket)
+
+        bucket['count'] += count
+        bucket['risk_sum'] += risk_sum
+        bucket['risk_max'] = max(bucket['risk_max'], risk_max)
+        for label, n in labels.items():
+            bucket['labels'][label] = bucket['labels'].get(label, 0) + n
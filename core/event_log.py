@@ -0,0 +1,144 @@
+"""
+Append-Only Event Log with Compacted Snapshots
+"""
+
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from .user_store import file_version
+
+class EventLog:
+    """A JSON document persisted as a snapshot plus a JSONL log of the seq-stamped events applied since"""
+
+    def __init__(self, snapshot_file: str, log_file: str = None,
+                 max_log_bytes: int = None, max_age_seconds: float = None):
+        self.snapshot_file = snapshot_file
+        self.log_file = log_file or f"{os.path.splitext(snapshot_file)[0]}.log.jsonl"
+        self.max_log_bytes = max_log_bytes if max_log_bytes is not None else config.EVENT_LOG_MAX_BYTES
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else config.EVENT_LOG_MAX_AGE_SECONDS
+
+        self.seq = 0
+        self.compacted_at = time.time()
+        self.log_bytes = 0
+        self.offset = 0
+        self.snapshot_version = None
+
+    def load(self) -> Tuple[Optional[Dict], List[Dict]]:
+        """Read the snapshot and the events that are newer than it"""
+        self.snapshot_version = file_version(self.snapshot_file)
+        self.offset = 0
+        snapshot = None
+        if os.path.exists(self.snapshot_file):
+            try:
+                with open(self.snapshot_file, 'r') as f:
+                    snapshot = json.load(f)
+            except:
+                snapshot = None
+
+        snapshot_seq = (snapshot or {}).get('event_seq', 0)
+        self.seq = snapshot_seq
+        self.compacted_at = (snapshot or {}).get('compacted_at', time.time())
+
+        events = self._read_from(0, snapshot_seq)
+        return snapshot, events
+
+    def read_new_events(self) -> Optional[List[Dict]]:
+        """
+        Events other writers appended since this instance last read or wrote,
+        or None when the snapshot was replaced (or the log truncated) and the
+        caller must reload everything. Call with the shared lock held.
+        """
+        if file_version(self.snapshot_file) != self.snapshot_version:
+            return None
+        size = os.path.getsize(self.log_file) if os.path.exists(self.log_file) else 0
+        if size < self.offset:
+            return None
+        if size == self.offset:
+            return []
+        return self._read_from(self.offset, self.seq)
+
+    def _read_from(self, offset: int, after_seq: int) -> List[Dict]:
+        events = []
+        if not os.path.exists(self.log_file):
+            self.log_bytes = self.offset = 0
+            return events
+
+        with open(self.log_file, 'rb') as f:
+            f.seek(offset)
+            for raw_line in f:
+                if not raw_line.endswith(b'\n'):
+                    # A torn final line from a crash mid-append; later appends start after it
+                    continue
+                try:
+                    event = json.loads(raw_line)
+                except ValueError:
+                    continue
+                if event.get('seq', 0) > after_seq:
+                    events.append(event)
+                    self.seq = max(self.seq, event['seq'])
+            self.offset = f.tell()
+        self.log_bytes = self.offset
+        return events
+
+    def append_many(self, events: List[Dict], fsync: bool = False) -> List[Dict]:
+        """Stamp and append a batch of events with a single write"""
+        stamped = []
+        for event in events:
+            self.seq += 1
+            stamped.append(dict(event, seq=self.seq))
+        data = ''.join(json.dumps(event) + '\n' for event in stamped)
+
+        with open(self.log_file, 'a') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+            self.offset = f.tell()
+        self.log_bytes = self.offset
+        return stamped
+
+    def needs_compaction(self) -> bool:
+        """Whether the log is big or old enough to fold into a new snapshot"""
+        if self.log_bytes == 0:
+            return False
+        if self.log_bytes >= self.max_log_bytes:
+            return True
+        return time.time() - self.compacted_at >= self.max_age_seconds
+
+    def compact(self, data: Dict):
+        """Atomically write a snapshot of `data`, then empty the log"""
+        self.compacted_at = time.time()
+        snapshot = dict(data, event_seq=self.seq, compacted_at=self.compacted_at)
+
+        tmp_file = f"{self.snapshot_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+        _fsync_directory(os.path.dirname(self.snapshot_file))
+        self.snapshot_version = file_version(self.snapshot_file)
+
+        # Safe to drop now: every logged event is covered by the snapshot's event_seq
+        with open(self.log_file, 'w') as f:
+            f.flush()
+            os.fsync(f.fileno())
+        self.log_bytes = self.offset = 0
+
+
+def _fsync_directory(path: str):
+    """Make a rename durable; not every platform can open a directory"""
+    try:
+        fd = os.open(path or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
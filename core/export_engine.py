@@ -0,0 +1,227 @@
+"""
+Streaming Export of Study Data to CSV, Parquet and Arrow
+"""
+
+import csv
+import io
+import json
+import zipfile
+from datetime import datetime
+from itertools import islice
+from typing import Dict, Iterator, List, Tuple
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+# Column names and types for every dataset; types are mapped to Arrow lazily
+DATASETS = {
+    'sessions': [
+        ('date', 'string'), ('study_minutes', 'int64'), ('study_seconds', 'int64'), ('sessions', 'int64')
+    ],
+    'emotions': [
+        ('timestamp', 'string'), ('primary_emotion', 'string'), ('risk_score', 'float64'), ('emotions', 'string')
+    ],
+    'emotion_rollups': [
+        ('resolution', 'string'), ('start', 'string'), ('count', 'int64'),
+        ('mean_risk', 'float64'), ('max_risk', 'float64'), ('labels', 'string')
+    ],
+    'completed_tasks': [
+        ('task', 'string'), ('completed_at', 'string')
+    ],
+    'tasks': [
+        ('id', 'int64'), ('text', 'string'), ('priority', 'string'), ('completed', 'bool_'),
+        ('created_at', 'string'), ('completed_at', 'string')
+    ]
+}
+
+FORMATS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+
+def available_formats() -> List[str]:
+    """Export formats usable in this environment (Parquet and Arrow need pyarrow)"""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return ['csv']
+    return list(FORMATS)
+
+class ExportEngine:
+    """Streams every dataset in chunks of rows to files, file objects or in-memory downloads"""
+
+    def __init__(self, stats_manager, task_manager=None, chunk_size: int = None):
+        self.stats_manager = stats_manager
+        self.task_manager = task_manager
+        self.chunk_size = chunk_size or config.EXPORT_CHUNK_SIZE
+
+    def datasets(self) -> List[str]:
+        return [name for name in DATASETS if name != 'tasks' or self.task_manager is not None]
+
+    # Row sources -------------------------------------------------------------
+
+    def iter_chunks(self, dataset: str) -> Iterator[List[Tuple]]:
+        """Yield lists of at most chunk_size row tuples for a dataset"""
+        if dataset not in DATASETS:
+            raise ValueError(f"Unknown dataset '{dataset}'")
+        return getattr(self, f"_chunks_{dataset}")()
+
+    def _chunks_sessions(self):
+        dates, seconds, sessions = self.stats_manager.daily_series.recorded_days()
+        for start in range(0, len(dates), self.chunk_size):
+            end = start + self.chunk_size
+            chunk_seconds = seconds[start:end]
+            # A zero count means the day predates per-session counting
+            counts = [int(n) if n else None for n in sessions[start:end]]
+            yield list(zip(
+                np.datetime_as_string(dates[start:end]).tolist(),
+                (chunk_seconds // 60).tolist(),
+                chunk_seconds.tolist(),
+                counts
+            ))
+
+    def _chunks_emotions(self):
+        store = self.stats_manager.store
+        if store is not None:
+            self.stats_manager.flush()
+            for rows in store.iter_rows(
+                "SELECT timestamp, primary_emotion, risk_score, emotions FROM emotion_history ORDER BY timestamp, id",
+                chunk_size=self.chunk_size
+            ):
+                yield [tuple(row) for row in rows]
+            return
+
+        yield from self._chunked(
+            (e['timestamp'], e['primary_emotion'], e['risk_score'], json.dumps(e['emotions']))
+            for e in self.stats_manager.data['emotion_history']
+        )
+
+    def _chunks_emotion_rollups(self):
+        rollups = self.stats_manager.data.get('emotion_rollups', {})
+        yield from self._chunked(
+            (resolution, b['start'], b['count'], b['risk_sum'] / b['count'], b['risk_max'], json.dumps(b['labels']))
+            for resolution in ('daily', 'hourly')
+            for b in rollups.get(resolution, [])
+        )
+
+    def _chunks_completed_tasks(self):
+        store = self.stats_manager.store
+        if store is not None:
+            self.stats_manager.flush()
+            for rows in store.iter_rows(
+                "SELECT task, completed_at FROM completed_tasks ORDER BY completed_at, id",
+                chunk_size=self.chunk_size
+            ):
+                yield [tuple(row) for row in rows]
+            return
+
+        yield from self._chunked(
+            (e['task'], e['completed_at']) for e in self.stats_manager.data['completed_tasks']
+        )
+
+    def _chunks_tasks(self):
+        store = getattr(self.task_manager, 'store', None)
+        if store is not None:
+            self.task_manager.flush()
+            for rows in store.iter_rows(
+                "SELECT id, text, priority, completed, created_at, completed_at FROM tasks ORDER BY id",
+                chunk_size=self.chunk_size
+            ):
+                yield [(r['id'], r['text'], r['priority'], bool(r['completed']), r['created_at'], r['completed_at'])
+                       for r in rows]
+            return
+
+        yield from self._chunked(
+            (t['id'], t['text'], t['priority'], t['completed'], t['created_at'], t.get('completed_at'))
+            for t in self.task_manager.tasks
+        )
+
+    def _chunked(self, rows: Iterator[Tuple]) -> Iterator[List[Tuple]]:
+        rows = iter(rows)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield chunk
+
+    # Writers -----------------------------------------------------------------
+
+    def write(self, dataset: str, destination, fmt: str = 'csv') -> int:
+        """Stream a dataset to a path or binary file object; returns the row count"""
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}'")
+
+        if isinstance(destination, (str, os.PathLike)):
+            with open(destination, 'wb') as f:
+                return self.write(dataset, f, fmt)
+
+        if fmt == 'csv':
+            return self._write_csv(dataset, destination)
+        return self._write_arrow(dataset, destination, fmt)
+
+    def _write_csv(self, dataset: str, binary_file) -> int:
+        text_file = io.TextIOWrapper(binary_file, encoding='utf-8', newline='', write_through=True)
+        try:
+            writer = csv.writer(text_file)
+            writer.writerow([name for name, _ in DATASETS[dataset]])
+            rows = 0
+            for chunk in self.iter_chunks(dataset):
+                writer.writerows(chunk)
+                rows += len(chunk)
+            return rows
+        finally:
+            # Leave the caller's file open
+            text_file.detach()
+
+    def _write_arrow(self, dataset: str, binary_file, fmt: str) -> int:
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError(f"Exporting to {fmt} requires pyarrow (pip install pyarrow)")
+
+        schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in DATASETS[dataset]])
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(binary_file, schema)
+        else:
+            writer = pa.ipc.new_file(binary_file, schema)
+
+        rows = 0
+        try:
+            for chunk in self.iter_chunks(dataset):
+                columns = list(zip(*chunk))
+                writer.write_batch(pa.RecordBatch.from_arrays(
+                    [pa.array(column, type=field.type) for column, field in zip(columns, schema)],
+                    schema=schema
+                ))
+                rows += len(chunk)
+        finally:
+            writer.close()
+        return rows
+
+    # Destinations ------------------------------------------------------------
+
+    def export_to_dir(self, directory: str = None, fmt: str = 'csv') -> Dict[str, str]:
+        """Write every dataset to its own file; returns dataset -> path"""
+        directory = directory or config.DATA_DIR
+        stamp = datetime.now().strftime('%Y%m%d')
+        paths = {}
+        for dataset in self.datasets():
+            path = os.path.join(directory, f"study_{dataset}_{stamp}{FORMATS[fmt]}")
+            self.write(dataset, path, fmt)
+            paths[dataset] = path
+        return paths
+
+    def to_bytes(self, dataset: str, fmt: str = 'csv') -> bytes:
+        """One dataset as an in-memory file"""
+        buffer = io.BytesIO()
+        self.write(dataset, buffer, fmt)
+        return buffer.getvalue()
+
+    def archive_bytes(self, fmt: str = 'csv') -> bytes:
+        """Every dataset in one in-memory zip, ready for st.download_button"""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            for dataset in self.datasets():
+                with archive.open(f"{dataset}{FORMATS[fmt]}", 'w') as member:
+                    self.write(dataset, member, fmt)
+        return buffer.getvalue()
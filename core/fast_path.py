@@ -0,0 +1,131 @@
+"""
+Lexicon Fast Path for Short, Clear-Cut Check-ins
+"""
+
+import re
+import threading
+from typing import Dict, List, Optional, Any
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+# Unambiguous cue words for GoEmotions labels (keys of config.EMOTION_RISK_MAP)
+EMOTION_LEXICON = {
+    'joy': ['happy', 'great', 'glad', 'awesome', 'amazing', 'wonderful', 'fantastic', 'cheerful', 'joyful'],
+    'excitement': ['excited', 'thrilled', 'pumped', 'hyped'],
+    'gratitude': ['grateful', 'thankful'],
+    'pride': ['proud'],
+    'relief': ['relieved'],
+    'optimism': ['hopeful', 'optimistic', 'motivated'],
+    'love': ['love', 'loving'],
+    'amusement': ['funny', 'hilarious', 'lol', 'haha'],
+    'curiosity': ['curious'],
+    'neutral': ['fine', 'okay', 'ok', 'meh'],
+    'nervousness': ['stressed', 'nervous', 'anxious', 'tense', 'overwhelmed', 'worried'],
+    'fear': ['scared', 'afraid', 'terrified', 'panicking'],
+    'sadness': ['sad', 'depressed', 'unhappy', 'miserable', 'lonely', 'crying', 'hopeless'],
+    'grief': ['grieving', 'heartbroken', 'devastated'],
+    'anger': ['angry', 'furious', 'mad'],
+    'annoyance': ['annoyed', 'irritated', 'frustrated'],
+    'disappointment': ['disappointed'],
+    'confusion': ['confused'],
+    'embarrassment': ['embarrassed', 'ashamed'],
+    'remorse': ['guilty', 'regret']
+}
+
+# Words that flip or hedge the meaning of a cue; such texts always go to the transformer
+NEGATION_WORDS = {'not', 'no', 'never', 'nothing', 'nobody', 'hardly', 'barely', 'without',
+                  'but', 'though', 'although', 'however', 'yet', 'if', 'kinda', 'maybe'}
+
+# Function words and feeling verbs that may surround a cue; any other word means the
+# text says more than the lexicon can read, so it goes to the transformer
+STOPWORDS = {'i', "i'm", 'im', 'me', 'my', 'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+             'feel', 'feeling', 'feels', 'felt', 'so', 'very', 'really', 'pretty', 'quite', 'super',
+             'too', 'just', 'a', 'an', 'the', 'and', 'today', 'now', 'right', 'this', 'it', "it's",
+             'its', 'all', 'totally', 'bit', 'little', 'of', 'kind', 'sort'}
+
+# Phrases about self-harm or suicide always go to the transformer, whatever else the text says
+RISK_PATTERN = re.compile(
+    r"\b(die|dying|dead|death|kill|killing|suicide|suicidal|overdose|worthless|"
+    r"hurt(ing)? myself|harm(ing)? myself|self[- ]?harm|cut(ting)? myself|"
+    r"end (it|it all|my life|everything)|want to disappear|no reason to live|better off without me|"
+    r"can'?t go on)\b"
+)
+
+WORD_PATTERN = re.compile(r"[a-z']+")
+
+class LexiconClassifier:
+    def __init__(self, max_words: int = None):
+        self.max_words = max_words or config.FAST_PATH_MAX_WORDS
+        self.word_to_emotion = {
+            word: emotion
+            for emotion, words in EMOTION_LEXICON.items()
+            if emotion in config.EMOTION_RISK_MAP
+            for word in words
+        }
+
+        self.attempts = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def classify(self, clean_text: str) -> Optional[List[Dict[str, Any]]]:
+        """Return emotions for a confidently classified text, or None to defer to the transformer"""
+        emotions = self._classify(clean_text)
+        with self._lock:
+            self.attempts += 1
+            if emotions is not None:
+                self.hits += 1
+        return emotions
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get how often the fast path answered"""
+        return {
+            'attempts': self.attempts,
+            'hits': self.hits,
+            'deferred': self.attempts - self.hits,
+            'hit_rate': (self.hits / self.attempts) * 100 if self.attempts else 0.0
+        }
+
+    def _classify(self, clean_text: str) -> Optional[List[Dict[str, Any]]]:
+        text = clean_text.lower()
+        if RISK_PATTERN.search(text):
+            return None
+
+        words = WORD_PATTERN.findall(text)
+        if not words or len(words) > self.max_words:
+            return None
+
+        if any(word in NEGATION_WORDS or word.endswith("n't") for word in words):
+            return None
+
+        matches = {}
+        for word in words:
+            emotion = self.word_to_emotion.get(word)
+            if emotion:
+                matches[emotion] = matches.get(emotion, 0) + 1
+            elif word not in STOPWORDS:
+                # An unread word could change the meaning entirely
+                return None
+
+        # Only a single, unopposed emotion counts as clear-cut
+        if len(matches) != 1:
+            return None
+
+        emotion_name, cue_count = next(iter(matches.items()))
+        confidence = min(0.9, 0.7 + 0.1 * (cue_count - 1))
+
+        emotions = [self._emotion_entry(emotion_name, confidence)]
+        if emotion_name != 'neutral':
+            emotions.append(self._emotion_entry('neutral', 1.0 - confidence))
+        return emotions
+
+    def _emotion_entry(self, emotion_name: str, confidence: float) -> Dict[str, Any]:
+        emotion_info = config.EMOTION_RISK_MAP.get(emotion_name, {})
+        return {
+            'emotion': emotion_name,
+            'confidence': confidence,
+            'risk_level': emotion_info.get('risk', 'low'),
+            'concern': emotion_info.get('concern', 'unknown'),
+            'color': emotion_info.get('color', '#6b7280')
+        }
@@ -0,0 +1,182 @@
+"""
+CPU Inference Backends for the Emotion Model
+"""
+
+import inspect
+import os
+import warnings
+from typing import Dict
+import torch
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+BACKENDS = ['fp32', 'int8', 'onnx', 'torchscript']
+
+class TorchBackend:
+    """Eager fp32 PyTorch (the reference backend)"""
+    name = 'fp32'
+
+    def __init__(self, model, device):
+        self.model = model
+        self.device = device
+
+    def __call__(self, inputs: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """Run a forward pass and return the logits"""
+        with torch.no_grad():
+            return self.model(**inputs).logits
+
+
+class QuantizedTorchBackend(TorchBackend):
+    """Dynamic int8 quantization of the Linear layers"""
+    name = 'int8'
+
+    def __init__(self, model, device):
+        quantized = torch.quantization.quantize_dynamic(
+            model.to('cpu'),
+            {torch.nn.Linear},
+            dtype=torch.qint8
+        )
+        quantized.eval()
+        super().__init__(quantized, torch.device('cpu'))
+
+
+class _LogitsOnly(torch.nn.Module):
+    """Wrap a classifier so that the exported graph returns plain logits"""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask):
+        return self.model(input_ids=input_ids, attention_mask=attention_mask, return_dict=False)[0]
+
+
+class TorchScriptBackend(TorchBackend):
+    """fp32 graph traced once with TorchScript and cached next to the weights"""
+    name = 'torchscript'
+
+    def __init__(self, model, device, traced_path: str = None):
+        from .model_artifacts import traced_graph_path
+
+        traced_path = traced_path or traced_graph_path()
+        self.graph_built = False
+
+        if traced_path and os.path.exists(traced_path):
+            graph = torch.jit.load(traced_path, map_location=device)
+        else:
+            if model is None:
+                raise RuntimeError("no cached graph and no model to trace")
+            graph = self.trace(model)
+            self.graph_built = True
+            if traced_path:
+                os.makedirs(os.path.dirname(traced_path), exist_ok=True)
+                tmp_path = f"{traced_path}.tmp"
+                torch.jit.save(graph, tmp_path)
+                os.replace(tmp_path, traced_path)
+                print("✅ Traced model graph saved locally!")
+
+        graph.eval()
+        super().__init__(graph, device)
+
+    @staticmethod
+    def trace(model):
+        """Trace the classifier with dynamic batch and sequence lengths"""
+        print("🔧 Tracing emotion model with TorchScript...")
+        dummy = torch.ones((1, 8), dtype=torch.long, device=next(model.parameters()).device)
+        with torch.no_grad(), warnings.catch_warnings():
+            warnings.simplefilter('ignore', torch.jit.TracerWarning)
+            return torch.jit.trace(_LogitsOnly(model.eval()), (dummy, dummy), check_trace=False)
+
+    def __call__(self, inputs: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """Run the traced graph and return the logits"""
+        with torch.no_grad():
+            return self.model(inputs['input_ids'], inputs['attention_mask'])
+
+
+class OnnxBackend:
+    """Exported ONNX graph run through ONNX Runtime, cached per weights and torch version"""
+    name = 'onnx'
+
+    def __init__(self, model, device, onnx_path: str = None):
+        import onnxruntime
+        from .model_artifacts import onnx_graph_path
+
+        self.device = torch.device('cpu')
+        keyed_path = onnx_path or onnx_graph_path()
+        self.onnx_path = keyed_path or config.ONNX_MODEL_PATH
+
+        # A file at the unkeyed path may come from other weights, so it is never reused
+        self.graph_built = keyed_path is None or not os.path.exists(self.onnx_path)
+        if self.graph_built:
+            self.export(model, self.onnx_path)
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = onnxruntime.InferenceSession(
+            self.onnx_path,
+            sess_options=options,
+            providers=['CPUExecutionProvider']
+        )
+
+    @staticmethod
+    def export(model, onnx_path: str):
+        """Export the classifier to an ONNX file with dynamic batch and sequence axes"""
+        from .model_artifacts import ONNX_OPSET
+
+        print("🔧 Exporting emotion model to ONNX...")
+        os.makedirs(os.path.dirname(onnx_path), exist_ok=True)
+
+        dummy = torch.ones((1, 8), dtype=torch.long)
+        tmp_path = f"{onnx_path}.tmp"
+
+        # Newer torch releases default to the dynamo exporter; keep the TorchScript one
+        export_kwargs = {}
+        if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+            export_kwargs['dynamo'] = False
+
+        torch.onnx.export(
+            # The exporter restores the wrapper's training flag on every submodule afterwards
+            _LogitsOnly(model.to('cpu').eval()).eval(),
+            (dummy, dummy),
+            tmp_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'}
+            },
+            opset_version=ONNX_OPSET,
+            **export_kwargs
+        )
+        os.replace(tmp_path, onnx_path)
+        print("✅ ONNX model saved locally!")
+
+    def __call__(self, inputs: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """Run the ONNX graph and return the logits as a tensor"""
+        feeds = {
+            'input_ids': inputs['input_ids'].cpu().numpy(),
+            'attention_mask': inputs['attention_mask'].cpu().numpy()
+        }
+        logits = self.session.run(['logits'], feeds)[0]
+        return torch.from_numpy(logits)
+
+
+def create_backend(name: str, model, device):
+    """Build the requested backend, falling back to fp32 if it is unavailable"""
+    if name not in BACKENDS:
+        print(f"⚠️ Unknown inference backend '{name}', using fp32")
+        return TorchBackend(model, device)
+
+    try:
+        if name == 'int8':
+            return QuantizedTorchBackend(model, device)
+        if name == 'onnx':
+            return OnnxBackend(model, device)
+        if name == 'torchscript':
+            return TorchScriptBackend(model, device)
+    except Exception as e:
+        print(f"⚠️ Could not start '{name}' backend ({e}), using fp32")
+
+    return TorchBackend(model, device)
@@ -0,0 +1,161 @@
+"""
+Shared Micro-Batching Inference Service
+"""
+
+import queue
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+_service = None
+_service_lock = threading.Lock()
+
+class _Request:
+    __slots__ = ('text', 'top_k', 'future', 'enqueued_at')
+
+    def __init__(self, text: str, top_k: int):
+        self.text = text
+        self.top_k = top_k
+        self.future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class InferenceService:
+    def __init__(self, analyzer, max_batch_size: int = None, max_wait_ms: float = None):
+        self.analyzer = analyzer
+        self.max_batch_size = max_batch_size or config.INFERENCE_MAX_BATCH_SIZE
+        self.max_wait = (max_wait_ms if max_wait_ms is not None else config.INFERENCE_MAX_WAIT_MS) / 1000
+
+        self.queue = queue.Queue()
+        self.is_running = True
+
+        self.requests_processed = 0
+        self.batches_processed = 0
+        self.batch_sizes = Counter()
+        self.max_queue_depth = 0
+        self.latencies = deque(maxlen=1000)
+        self._metrics_lock = threading.Lock()
+
+        self.worker_thread = threading.Thread(target=self._worker_loop, name='emotion-inference', daemon=True)
+        self.worker_thread.start()
+
+    def submit(self, text: str, top_k: int = 5) -> Future:
+        """Queue a text for analysis and return a future for its result"""
+        if not self.is_running:
+            raise RuntimeError("Inference service has been shut down.")
+
+        request = _Request(text, top_k)
+        self.queue.put(request)
+
+        depth = self.queue.qsize()
+        with self._metrics_lock:
+            self.max_queue_depth = max(self.max_queue_depth, depth)
+        return request.future
+
+    def analyze(self, text: str, top_k: int = 5, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Analyze a text through the shared worker, blocking until the result is ready"""
+        return self.submit(text, top_k).result(timeout)
+
+    def shutdown(self, timeout: float = 5):
+        """Stop the worker after the requests already queued have been served"""
+        self.is_running = False
+        self.queue.put(None)
+        self.worker_thread.join(timeout)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth, batch size and latency metrics"""
+        with self._metrics_lock:
+            latencies = sorted(self.latencies)
+            batch_sizes = dict(self.batch_sizes)
+            requests = self.requests_processed
+            batches = self.batches_processed
+            max_depth = self.max_queue_depth
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))] * 1000
+
+        return {
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': max_depth,
+            'requests_processed': requests,
+            'batches_processed': batches,
+            'average_batch_size': requests / batches if batches else 0.0,
+            'batch_size_histogram': batch_sizes,
+            'latency_p50_ms': percentile(50),
+            'latency_p99_ms': percentile(99)
+        }
+
+    def _worker_loop(self):
+        """Gather requests that arrive within a short window into one forward pass"""
+        while True:
+            request = self.queue.get()
+            if request is None:
+                break
+
+            batch = [request]
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self.queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if request is None:
+                    stop = True
+                    break
+                batch.append(request)
+
+            self._run_batch(batch)
+            if stop:
+                break
+
+    def _run_batch(self, batch: List[_Request]):
+        """Run one batch per distinct top_k and resolve every caller's future"""
+        groups = {}
+        for request in batch:
+            groups.setdefault(request.top_k, []).append(request)
+
+        for top_k, requests in groups.items():
+            try:
+                results = self.analyzer.analyze_emotions_batch(
+                    [r.text for r in requests],
+                    top_k=top_k,
+                    batch_size=len(requests)
+                )
+            except Exception as e:
+                for r in requests:
+                    r.future.set_exception(e)
+                continue
+
+            for r, result in zip(requests, results):
+                r.future.set_result(result)
+
+        finished = time.perf_counter()
+        with self._metrics_lock:
+            self.requests_processed += len(batch)
+            self.batches_processed += 1
+            self.batch_sizes[len(batch)] += 1
+            self.latencies.extend(finished - r.enqueued_at for r in batch)
+
+
+def get_inference_service(analyzer=None) -> InferenceService:
+    """Get the process-wide inference service, creating it around `analyzer` on first use"""
+    global _service
+    with _service_lock:
+        if _service is None:
+            if analyzer is None:
+                from .emotion_analyzer import EmotionAnalyzer
+                analyzer = EmotionAnalyzer()
+            _service = InferenceService(analyzer)
+        return _service
@@ -0,0 +1,89 @@
+"""
+On-Disk Model Artifacts: safetensors weights and cached TorchScript/ONNX graphs
+"""
+
+import hashlib
+import json
+import os
+from typing import Optional
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+SAFETENSORS_FILE = "model.safetensors"
+PICKLE_WEIGHTS_FILE = "pytorch_model.bin"
+FINGERPRINT_FILE = "model.safetensors.sha256.json"
+TRACED_DIR = "traced"
+ONNX_OPSET = 14
+
+def ensure_safetensors(model, model_path: str) -> bool:
+    """Rewrite pickled weights as safetensors so later starts memory-map them; returns True if converted"""
+    safetensors_path = os.path.join(model_path, SAFETENSORS_FILE)
+    if os.path.exists(safetensors_path):
+        return False
+
+    print("🔧 Converting model weights to safetensors...")
+    model.save_pretrained(model_path, safe_serialization=True)
+
+    pickle_path = os.path.join(model_path, PICKLE_WEIGHTS_FILE)
+    if os.path.exists(safetensors_path) and os.path.exists(pickle_path):
+        os.remove(pickle_path)
+    return True
+
+
+def model_fingerprint(model_path: str) -> Optional[str]:
+    """SHA-256 of the safetensors weights, remembered next to them until the file changes"""
+    weights_path = os.path.join(model_path, SAFETENSORS_FILE)
+    if not os.path.exists(weights_path):
+        return None
+
+    stat = os.stat(weights_path)
+    fingerprint_path = os.path.join(model_path, FINGERPRINT_FILE)
+    if os.path.exists(fingerprint_path):
+        try:
+            with open(fingerprint_path, 'r') as f:
+                cached = json.load(f)
+            if cached['size'] == stat.st_size and cached['mtime_ns'] == stat.st_mtime_ns:
+                return cached['sha256']
+        except:
+            pass
+
+    digest = hashlib.sha256()
+    with open(weights_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    sha256 = digest.hexdigest()
+
+    try:
+        with open(fingerprint_path, 'w') as f:
+            json.dump({'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}, f)
+    except Exception as e:
+        print(f"Error saving model fingerprint: {e}")
+    return sha256
+
+
+def traced_graph_path(model_path: str = None) -> Optional[str]:
+    """Where the TorchScript graph for these weights and this torch version is cached"""
+    import torch
+
+    model_path = model_path or config.MODEL_PATH
+    fingerprint = model_fingerprint(model_path)
+    if fingerprint is None:
+        return None
+
+    torch_version = torch.__version__.replace('+', '_')
+    return os.path.join(model_path, TRACED_DIR, f"{fingerprint[:16]}-torch{torch_version}.pt")
+
+
+def onnx_graph_path(model_path: str = None, onnx_path: str = None) -> Optional[str]:
+    """Where the ONNX export of these weights, this torch version and opset is cached"""
+    import torch
+
+    model_path = model_path or config.MODEL_PATH
+    fingerprint = model_fingerprint(model_path)
+    if fingerprint is None:
+        return None
+
+    stem, ext = os.path.splitext(onnx_path or config.ONNX_MODEL_PATH)
+    torch_version = torch.__version__.replace('+', '_')
+    return f"{stem}-{fingerprint[:16]}-torch{torch_version}-opset{ONNX_OPSET}{ext}"
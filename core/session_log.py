@@ -0,0 +1,116 @@
+"""
+Array-Backed Log of Individual Timer Sessions
+"""
+
+import os
+from typing import Optional
+import numpy as np
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+PHASES = ['focus', 'short_break', 'long_break']
+
+# Start and end are naive local wall-clock seconds since 1970 (see stats_aggregates.wall_seconds);
+# seconds is the time actually studied, less than end - start when the timer was paused
+RECORD_DTYPE = np.dtype([('start', '<i8'), ('end', '<i8'), ('seconds', '<i4'), ('phase', 'i1')])
+
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+
+class SessionLog:
+    """Every timer session as a packed record in a NumPy array, persisted as an append-only binary file"""
+
+    def __init__(self, path: str = None):
+        self.path = path or config.SESSION_LOG_FILE
+        self.records = np.zeros(0, dtype=RECORD_DTYPE)
+        self.length = 0
+        self._flushed = 0
+        self._file_size = 0
+
+    def add(self, start: float, end: float, seconds: int, phase: str = 'focus'):
+        if self.length == len(self.records):
+            grown = np.zeros(max(64, len(self.records) * 2), dtype=RECORD_DTYPE)
+            grown[:self.length] = self.records[:self.length]
+            self.records = grown
+        self.records[self.length] = (int(start), max(int(end), int(start)), int(seconds),
+                                     PHASES.index(phase) if phase in PHASES else -1)
+        self.length += 1
+
+    def view(self) -> np.ndarray:
+        return self.records[:self.length]
+
+    def __len__(self) -> int:
+        return self.length
+
+    # Queries ---------------------------------------------------------------
+
+    def heatmap(self, phase: Optional[str] = 'focus', since: float = None) -> np.ndarray:
+        """
+        Studied seconds per weekday (rows, Monday first) and hour of day
+        (columns). A session spanning several hours is split across them in
+        proportion to its wall-clock overlap with each hour.
+        """
+        records = self.view()
+        mask = np.ones(len(records), dtype=bool)
+        if phase is not None:
+            mask &= records['phase'] == PHASES.index(phase)
+        if since is not None:
+            mask &= records['end'] > since
+        records = records[mask]
+        if not len(records):
+            return np.zeros((7, 24))
+
+        start = records['start']
+        end = np.maximum(records['end'], start + 1)
+        first_hour = start // 3600
+        spans = (end - 1) // 3600 - first_hour + 1
+
+        # One row per (session, hour touched)
+        session = np.repeat(np.arange(len(records)), spans)
+        hour = first_hour[session] + np.arange(len(session)) - np.repeat(np.cumsum(spans) - spans, spans)
+        overlap = np.minimum(end[session], (hour + 1) * 3600) - np.maximum(start[session], hour * 3600)
+        studied = overlap * (records['seconds'] / (end - start))[session]
+
+        # Day 0 (1970-01-01) was a Thursday, weekday 3 counting from Monday
+        slot = ((hour // 24 + 3) % 7) * 24 + hour % 24
+        return np.bincount(slot, weights=studied, minlength=7 * 24).reshape(7, 24)
+
+    # Persistence -------------------------------------------------------------
+
+    def load(self) -> 'SessionLog':
+        """Read every complete record from disk, replacing the in-memory log"""
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+        else:
+            raw = b''
+        # Ignore a torn trailing record from a crash mid-append
+        count = len(raw) // RECORD_DTYPE.itemsize
+        self.records = np.frombuffer(raw, dtype=RECORD_DTYPE, count=count).copy()
+        self.length = self._flushed = count
+        self._file_size = count * RECORD_DTYPE.itemsize
+        return self
+
+    def flush(self, fsync: bool = False):
+        """
+        Append records added since the last flush. Writers sharing the file
+        must hold a common lock around this call.
+        """
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        pending = self.records[self._flushed:self.length].copy()
+        if len(pending):
+            with open(self.path, 'ab') as f:
+                if size % RECORD_DTYPE.itemsize:
+                    # Realign after a torn record so later records stay readable
+                    f.truncate(size - size % RECORD_DTYPE.itemsize)
+                f.write(pending.tobytes())
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+
+        if size != self._file_size:
+            # Another process appended since we last read; pick up its sessions too
+            self.load()
+        else:
+            self._flushed = self.length
+            self._file_size = size + pending.nbytes
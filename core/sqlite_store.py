@@ -0,0 +1,374 @@
+"""
+SQLite Storage Backend for Statistics and Tasks
+"""
+
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterator, List, Set
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_sessions (
+    date TEXT PRIMARY KEY,
+    seconds INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS emotion_history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT NOT NULL,
+    risk_score REAL NOT NULL,
+    primary_emotion TEXT,
+    emotions TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_emotion_history_timestamp ON emotion_history (timestamp);
+CREATE TABLE IF NOT EXISTS completed_tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    task TEXT NOT NULL,
+    completed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_completed_tasks_completed_at ON completed_tasks (completed_at);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    text TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL,
+    completed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (completed, id);
+CREATE TABLE IF NOT EXISTS emotion_rollups (
+    resolution TEXT NOT NULL,
+    start TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    risk_sum REAL NOT NULL,
+    risk_max REAL NOT NULL,
+    labels TEXT NOT NULL,
+    PRIMARY KEY (resolution, start)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+# Scalar statistics kept in the meta table as JSON values
+STATS_SCALARS = ['total_study_time', 'longest_streak', 'current_streak', 'last_study_date',
+                 'sessions_completed', 'total_breaks_taken']
+# Scalars written as a whole on each flush; the counters are incremented in SQL instead
+# so concurrent writers never overwrite each other's totals
+STREAK_SCALARS = ['longest_streak', 'current_streak', 'last_study_date', 'total_breaks_taken']
+
+class SQLiteStore:
+    def __init__(self, db_file: str = None):
+        self.db_file = db_file or config.SQLITE_DB_FILE
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.db_file, check_same_thread=False, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def transaction(self):
+        """Context manager that runs a block of statements as one atomic write"""
+        return _Transaction(self)
+
+    # Meta ------------------------------------------------------------------
+
+    def get_meta(self, key: str, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row['value']) if row else default
+
+    def set_meta(self, key: str, value):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value))
+        )
+
+    # Statistics --------------------------------------------------------------
+
+    def load_stats(self, recent_emotions: int = 100) -> Dict:
+        """Load scalars, the per-day totals and only the most recent emotion entries"""
+        with self._lock:
+            data = {key: self.get_meta(key) for key in STATS_SCALARS}
+            data['daily_sessions'] = {
+                row['date']: row['seconds']
+                for row in self.conn.execute("SELECT date, seconds FROM daily_sessions ORDER BY date")
+            }
+            rows = self.conn.execute(
+                "SELECT timestamp, risk_score, primary_emotion, emotions FROM emotion_history "
+                "ORDER BY timestamp DESC, id DESC LIMIT ?",
+                (recent_emotions,)
+            ).fetchall()
+            data['emotion_history'] = [self._emotion_row(row) for row in reversed(rows)]
+            # Completed tasks stay in the database; they are only ever appended to
+            data['completed_tasks'] = []
+        return {key: value for key, value in data.items() if value is not None}
+
+    def save_stat_scalars(self, data: Dict, keys: List[str] = None):
+        for key in keys or STATS_SCALARS:
+            self.set_meta(key, data.get(key))
+
+    def increment_meta(self, key: str, amount: int):
+        self.conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = "
+            "CAST(CAST(value AS INTEGER) + CAST(excluded.value AS INTEGER) AS TEXT)",
+            (key, json.dumps(amount))
+        )
+
+    def add_session_seconds(self, date: str, seconds: int):
+        self.conn.execute(
+            "INSERT INTO daily_sessions (date, seconds) VALUES (?, ?) "
+            "ON CONFLICT(date) DO UPDATE SET seconds = seconds + excluded.seconds",
+            (date, seconds)
+        )
+
+    def set_daily_sessions(self, daily_sessions: Dict[str, int]):
+        self.conn.executemany(
+            "INSERT INTO daily_sessions (date, seconds) VALUES (?, ?) "
+            "ON CONFLICT(date) DO UPDATE SET seconds = excluded.seconds",
+            list(daily_sessions.items())
+        )
+
+    def add_emotion_entries(self, entries: List[Dict]):
+        self.conn.executemany(
+            "INSERT INTO emotion_history (timestamp, risk_score, primary_emotion, emotions) VALUES (?, ?, ?, ?)",
+            [(e['timestamp'], e['risk_score'], e['primary_emotion'], json.dumps(e['emotions'])) for e in entries]
+        )
+
+    def add_completed_tasks(self, entries: List[Dict]):
+        self.conn.executemany(
+            "INSERT INTO completed_tasks (task, completed_at) VALUES (?, ?)",
+            [(e['task'], e['completed_at']) for e in entries]
+        )
+
+    def apply_stats_event(self, event: Dict):
+        """Write the row change for one statistics event"""
+        event_type = event['type']
+        if event_type == 'session_time':
+            self.add_session_seconds(event['date'], event['seconds'])
+            self.increment_meta('total_study_time', event['seconds'])
+            self.increment_meta('sessions_completed', 1)
+        elif event_type == 'emotion_entry':
+            self.add_emotion_entries([event['entry']])
+        elif event_type == 'completed_task':
+            self.add_completed_tasks([event['entry']])
+
+    def get_daily_seconds(self, start_date: str, end_date: str) -> Dict[str, int]:
+        """Per-day seconds for an inclusive date range (primary-key range scan)"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT date, seconds FROM daily_sessions WHERE date BETWEEN ? AND ?",
+                (start_date, end_date)
+            ).fetchall()
+        return {row['date']: row['seconds'] for row in rows}
+
+    def get_emotions_since(self, cutoff_timestamp: str) -> List[Dict]:
+        """Timestamp, risk score and primary emotion of entries newer than the cutoff, oldest first"""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT timestamp, risk_score, primary_emotion FROM emotion_history "
+                "WHERE timestamp > ? ORDER BY timestamp, id",
+                (cutoff_timestamp,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def has_stats(self) -> bool:
+        return self.get_meta('stats_initialized', False)
+
+    def import_stats(self, data: Dict):
+        """One-shot import of a JSON statistics document"""
+        with self.transaction():
+            self.set_daily_sessions(data.get('daily_sessions', {}))
+            self.add_emotion_entries(data.get('emotion_history', []))
+            self.add_completed_tasks(data.get('completed_tasks', []))
+            self.import_emotion_rollups(data.get('emotion_rollups', {}))
+            self.save_stat_scalars(data)
+            self.set_meta('stats_initialized', True)
+
+    def import_emotion_rollups(self, rollups: Dict[str, List[Dict]]):
+        """
+        Keep the hourly/daily buckets of a JSON history. Their entries exist
+        nowhere else, since the JSON backend only keeps recent entries raw.
+        """
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO emotion_rollups (resolution, start, count, risk_sum, risk_max, labels) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(resolution, b['start'], b['count'], b['risk_sum'], b['risk_max'], json.dumps(b['labels']))
+             for resolution in ('hourly', 'daily') for b in rollups.get(resolution, [])]
+        )
+        self.set_meta('rollups_initialized', True)
+
+    def has_emotion_rollups(self) -> bool:
+        return self.get_meta('rollups_initialized', False)
+
+    def load_emotion_rollups(self) -> Dict[str, List[Dict]]:
+        """Imported buckets by resolution, oldest first"""
+        rollups = {'hourly': [], 'daily': []}
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT resolution, start, count, risk_sum, risk_max, labels FROM emotion_rollups ORDER BY start"
+            ).fetchall()
+        for row in rows:
+            rollups[row['resolution']].append({
+                'start': row['start'],
+                'count': row['count'],
+                'risk_sum': row['risk_sum'],
+                'risk_max': row['risk_max'],
+                'labels': json.loads(row['labels'])
+            })
+        return rollups
+
+    def iter_rows(self, query: str, params: tuple = (), chunk_size: int = 1000) -> Iterator[List[sqlite3.Row]]:
+        """
+        Stream a query in chunks on a dedicated read connection, so a long
+        export neither holds the store lock nor loads the table into memory
+        """
+        conn = sqlite3.connect(self.db_file)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield rows
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _emotion_row(row) -> Dict:
+        return {
+            'timestamp': row['timestamp'],
+            'emotions': json.loads(row['emotions']),
+            'risk_score': row['risk_score'],
+            'primary_emotion': row['primary_emotion']
+        }
+
+    # Tasks -----------------------------------------------------------------
+
+    def load_tasks(self) -> List[Dict]:
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM tasks ORDER BY id").fetchall()
+        return [self._task_row(row) for row in rows]
+
+    def get_pending_tasks(self) -> List[Dict]:
+        """Pending tasks in id order (served from the (completed, id) index)"""
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM tasks WHERE completed = 0 ORDER BY id").fetchall()
+        return [self._task_row(row) for row in rows]
+
+    def get_completed_tasks(self) -> List[Dict]:
+        with self._lock:
+            rows = self.conn.execute("SELECT * FROM tasks WHERE completed = 1 ORDER BY id").fetchall()
+        return [self._task_row(row) for row in rows]
+
+    def upsert_tasks(self, tasks: List[Dict]):
+        self.conn.executemany(
+            "INSERT INTO tasks (id, text, priority, completed, created_at, completed_at) "
+            "VALUES (:id, :text, :priority, :completed, :created_at, :completed_at) "
+            "ON CONFLICT(id) DO UPDATE SET text = excluded.text, priority = excluded.priority, "
+            "completed = excluded.completed, created_at = excluded.created_at, completed_at = excluded.completed_at",
+            [dict(task, completed=int(task['completed']), completed_at=task.get('completed_at')) for task in tasks]
+        )
+
+    def update_tasks(self, tasks: List[Dict]):
+        """Update existing rows only, so a task another writer deleted stays deleted"""
+        self.conn.executemany(
+            "UPDATE tasks SET text = :text, priority = :priority, completed = :completed, "
+            "created_at = :created_at, completed_at = :completed_at WHERE id = :id",
+            [dict(task, completed=int(task['completed']), completed_at=task.get('completed_at')) for task in tasks]
+        )
+
+    def existing_task_ids(self, task_ids: List[int]) -> Set[int]:
+        existing = set()
+        for start in range(0, len(task_ids), 500):
+            chunk = task_ids[start:start + 500]
+            rows = self.conn.execute(
+                f"SELECT id FROM tasks WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            existing.update(row['id'] for row in rows)
+        return existing
+
+    def max_task_id(self) -> int:
+        return self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM tasks").fetchone()[0]
+
+    def delete_tasks(self, task_ids: List[int]):
+        self.conn.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in task_ids])
+
+    def replace_tasks(self, tasks: List[Dict]):
+        with self.transaction():
+            self.conn.execute("DELETE FROM tasks")
+            self.upsert_tasks(tasks)
+
+    def has_tasks(self) -> bool:
+        return self.get_meta('tasks_initialized', False)
+
+    def import_tasks(self, tasks: List[Dict], next_id: int = 1):
+        """One-shot import of a JSON task list and its id high-water mark; ids must be unique, nothing is overwritten"""
+        with self.transaction():
+            self.conn.executemany(
+                "INSERT INTO tasks (id, text, priority, completed, created_at, completed_at) "
+                "VALUES (:id, :text, :priority, :completed, :created_at, :completed_at)",
+                [dict(task, completed=int(task['completed']), completed_at=task.get('completed_at'))
+                 for task in tasks]
+            )
+            imported = self.conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+            if imported != len(tasks):
+                # Raising rolls the import back and leaves tasks.json as the source of truth
+                raise ValueError(f"Task import stored {imported} rows for {len(tasks)} tasks")
+            self.set_meta('next_task_id', next_id)
+            self.set_meta('tasks_initialized', True)
+
+    @staticmethod
+    def _task_row(row) -> Dict:
+        task = {
+            'id': row['id'],
+            'text': row['text'],
+            'priority': row['priority'],
+            'completed': bool(row['completed']),
+            'created_at': row['created_at']
+        }
+        if row['completed_at'] is not None:
+            task['completed_at'] = row['completed_at']
+        return task
+
+
+class _Transaction:
+    def __init__(self, store: SQLiteStore):
+        self.store = store
+
+    def __enter__(self):
+        self.store._lock.acquire()
+        self.store.conn.execute("BEGIN IMMEDIATE")
+        return self.store
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.store.conn.execute("COMMIT")
+            else:
+                self.store.conn.execute("ROLLBACK")
+        finally:
+            self.store._lock.release()
+        return False
+
+
+def get_sqlite_store(db_file: str = None) -> SQLiteStore:
+    """Get the process-wide store for a database file, opening it on first use"""
+    db_file = db_file or config.SQLITE_DB_FILE
+    with _stores_lock:
+        if db_file not in _stores:
+            _stores[db_file] = SQLiteStore(db_file)
+        return _stores[db_file]
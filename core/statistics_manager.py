@@ -1,63 +1,175 @@
-<<<<<<< HEAD
 """
 Statistics and Progress Tracking System
 """
 
-import json
+import copy
 import os
+import threading
+from bisect import bisect_right
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+import numpy as np
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from .event_log import EventLog
+from .sqlite_store import get_sqlite_store, STREAK_SCALARS
+from .stats_aggregates import StatsAggregates, wall_seconds
+from .daily_series import DailySeries
+from .session_log import SessionLog
+from .streak_engine import StreakEngine
+from .emotion_rollups import EmotionRollups
+from .write_behind import WriteBehind
+from .user_store import FileLock, user_data_dir, user_path
 
 class StatisticsManager:
-    def __init__(self):
-        self.stats_file = os.path.join(config.DATA_DIR, "statistics.json")
+    def __init__(self, user_id: str = None):
+        self.user_id = user_id
+        self.stats_file = os.path.join(user_data_dir(user_id), "statistics.json")
+        # Sidecar files live next to the snapshot, like the event log, whatever DATA_DIR was at import
+        self.daily_series_file = os.path.join(os.path.dirname(self.stats_file),
+                                              os.path.basename(config.DAILY_SERIES_FILE))
+        self.event_log = EventLog(self.stats_file)
+        # Serializes log appends and compactions with other processes writing this user's files
+        self.file_lock = FileLock(f"{self.stats_file}.lock")
+        self.store = (get_sqlite_store(user_path(user_id, config.SQLITE_DB_FILE))
+                      if config.STORAGE_BACKEND == "sqlite" else None)
+        # SQLite keeps the full emotion history, so only the JSON backend caps the window
+        self.aggregates = StatsAggregates(
+            max_window_entries=None if self.store is not None else config.EMOTION_RAW_MAX_ENTRIES
+        )
+        self.daily_series = DailySeries(self.daily_series_file)
+        # Per-session records live only in their own append-only file, not in the event log
+        self.session_log = SessionLog(os.path.join(os.path.dirname(self.stats_file),
+                                                   os.path.basename(config.SESSION_LOG_FILE))).load()
+        self.streaks = StreakEngine()
+        # Sorted epoch seconds parallel to data['emotion_history'], for bisect window queries
+        self.emotion_times: List[float] = []
+        
+        self._lock = threading.RLock()
+        self._pending_events: List[Dict] = []
+        self.flusher = WriteBehind(self._flush_pending, "statistics")
         self.data = self.load_stats()
     
     def load_stats(self) -> Dict:
-        """Load statistics from file"""
-        if os.path.exists(self.stats_file):
-            try:
-                with open(self.stats_file, 'r') as f:
-                    return json.load(f)
-            except:
-                pass
+        """Load statistics from the configured storage backend"""
+        # A reload can run on the flush thread while the UI reads, so rebuild into a
+        # staging copy and swap the finished state in, never exposing a half-loaded one
+        staged = copy.copy(self)
+        staged.aggregates = StatsAggregates(self.aggregates.window_days, self.aggregates.max_window_entries)
+        staged.daily_series = DailySeries(self.daily_series_file)
+        staged.streaks = StreakEngine()
         
-        return {
-            'daily_sessions': {},
-            'completed_tasks': [],
-            'emotion_history': [],
-            'total_study_time': 0,
-            'longest_streak': 0,
-            'current_streak': 0,
-            'last_study_date': None,
-            'sessions_completed': 0,
-            'total_breaks_taken': 0
-        }
+        with self.file_lock:
+            if staged.store is not None:
+                staged._load_sqlite_stats()
+            else:
+                staged._load_json_stats()
+            
+            staged._age_out_emotions()
+            staged.aggregates.rebuild(staged.data['daily_sessions'], *staged._raw_window_emotions())
+            staged.daily_series = staged._load_daily_series()
+            staged.recompute_streaks()
+        
+        with self._lock:
+            for name in ('data', 'emotion_times', 'aggregates', 'daily_series', 'streaks'):
+                setattr(self, name, getattr(staged, name))
+        return self.data
     
-    def save_stats(self):
-        """Save statistics to file"""
+    def _load_daily_series(self) -> DailySeries:
+        """Load the binary day series, rebuilding it if it disagrees with the statistics"""
         try:
-            with open(self.stats_file, 'w') as f:
-                json.dump(self.data, f, indent=2)
+            series = DailySeries.load(self.daily_series_file)
+            if (series.total() == self.data['total_study_time']
+                    and series.day_count() == len(self.data['daily_sessions'])):
+                return series
+        except Exception:
+            pass
+        
+        series = DailySeries.from_dict(self.data['daily_sessions'], self.daily_series_file)
+        try:
+            series.save()
         except Exception as e:
             print(f"Error saving statistics: {e}")
+        return series
     
-    def add_session_time(self, seconds: int):
-        """Add completed session time"""
-        today = datetime.now().strftime("%Y-%m-%d")
+    def _load_sqlite_stats(self) -> Dict:
+        """Load statistics from SQLite, importing the JSON files on first start"""
+        try:
+            if not self.store.has_stats():
+                self.store.import_stats(self._load_json_stats())
+            elif not self.store.has_emotion_rollups():
+                # Databases migrated before rollups were imported: the JSON snapshot still has them
+                with self.store.transaction():
+                    self.store.import_emotion_rollups(self._load_json_stats().get('emotion_rollups', {}))
+            self.data = self._default_stats()
+            self.data.update(self.store.load_stats(recent_emotions=config.EMOTION_RAW_MAX_ENTRIES))
+            # Pre-migration history that only survives as buckets; read-only from here on
+            self.data['emotion_rollups'] = self.store.load_emotion_rollups()
+        except Exception as e:
+            print(f"Error loading statistics: {e}")
+            self.data = self._default_stats()
+        
+        self._index_emotion_times()
+        return self.data
+    
+    def _load_json_stats(self) -> Dict:
+        """Load the statistics snapshot and replay the events logged since"""
+        try:
+            snapshot, events = self.event_log.load()
+        except Exception as e:
+            print(f"Error loading statistics: {e}")
+            snapshot, events = None, []
         
-        if today not in self.data['daily_sessions']:
-            self.data['daily_sessions'][today] = 0
+        self.data = self._default_stats()
+        if snapshot:
+            snapshot.pop('event_seq', None)
+            snapshot.pop('compacted_at', None)
+            self.data.update(snapshot)
         
-        self.data['daily_sessions'][today] += seconds
-        self.data['total_study_time'] += seconds
-        self.data['sessions_completed'] += 1
+        self._index_emotion_times()
+        for event in events:
+            self._apply_event(event)
         
-        self._update_streak()
-        self.save_stats()
+        return self.data
+    
+    def save_stats(self):
+        """Write a full snapshot of the statistics and clear the event log"""
+        self.flush()
+        try:
+            with self._lock, self.file_lock:
+                if self.store is not None:
+                    # Day totals and counters are written per event; rewriting them
+                    # here would clobber sessions other processes added meanwhile
+                    with self.store.transaction():
+                        self.store.save_stat_scalars(self.data, STREAK_SCALARS)
+                else:
+                    self._merge_external_events([])
+                    self.event_log.compact(self.data)
+                self.daily_series.save(fsync=True)
+                self.session_log.flush(fsync=True)
+        except Exception as e:
+            print(f"Error saving statistics: {e}")
+    
+    def flush(self) -> bool:
+        """Write pending statistics to disk now"""
+        return self.flusher.flush()
+    
+    def get_persistence_stats(self) -> Dict:
+        """Get statistics flush counters"""
+        return self.flusher.get_stats()
+    
+    def add_session_time(self, seconds: int, start_time: datetime = None, phase: str = 'focus'):
+        """Add completed session time, recording when the session ran"""
+        end_time = datetime.now()
+        start_time = start_time or end_time - timedelta(seconds=seconds)
+        with self._lock:
+            self.session_log.add(wall_seconds(start_time), wall_seconds(end_time), seconds, phase)
+            self._record({
+                'type': 'session_time',
+                'date': end_time.strftime("%Y-%m-%d"),
+                'seconds': seconds
+            })
     
     def add_emotion_entry(self, emotion_data: Dict):
         """Add emotion analysis entry"""
@@ -67,13 +179,7 @@ class StatisticsManager:
             'risk_score': emotion_data['risk_score'],
             'primary_emotion': emotion_data['primary_emotion']['emotion'] if emotion_data['primary_emotion'] else None
         }
-        
-        self.data['emotion_history'].append(entry)
-        
-        if len(self.data['emotion_history']) > 100:
-            self.data['emotion_history'] = self.data['emotion_history'][-100:]
-        
-        self.save_stats()
+        self._record({'type': 'emotion_entry', 'entry': entry})
     
     def add_completed_task(self, task: str):
         """Add a completed task"""
@@ -81,8 +187,141 @@ class StatisticsManager:
             'task': task,
             'completed_at': datetime.now().isoformat()
         }
-        self.data['completed_tasks'].append(entry)
-        self.save_stats()
+        self._record({'type': 'completed_task', 'entry': entry})
+    
+    def add_completed_tasks(self, tasks: List[str]):
+        """Add completed-task entries for a batch of tasks, persisted in one write"""
+        completed_at = datetime.now().isoformat()
+        self._record_many([
+            {'type': 'completed_task', 'entry': {'task': task, 'completed_at': completed_at}}
+            for task in tasks
+        ])
+    
+    def _record(self, event: Dict):
+        """Apply a mutation in memory and queue it for the next write-behind flush"""
+        self._record_many([event])
+    
+    def _record_many(self, events: List[Dict]):
+        if not events:
+            return
+        with self._lock:
+            for event in events:
+                self._apply_event(event)
+            self._pending_events.extend(events)
+        self.flusher.mark_dirty()
+    
+    def _flush_pending(self):
+        """Persist every queued event in one log append or one transaction"""
+        with self._lock:
+            events, self._pending_events = self._pending_events, []
+            if not events:
+                return
+            
+            with self.file_lock:
+                try:
+                    if self.store is not None:
+                        with self.store.transaction():
+                            for event in events:
+                                self.store.apply_stats_event(event)
+                            self.store.save_stat_scalars(self.data, STREAK_SCALARS)
+                    else:
+                        self._merge_external_events(events)
+                        self.event_log.append_many(events, fsync=self.flusher.fsync)
+                        if self.event_log.needs_compaction():
+                            self.event_log.compact(self.data)
+                except Exception:
+                    self._pending_events = events + self._pending_events
+                    raise
+                
+                if any(event['type'] == 'session_time' for event in events):
+                    self.daily_series.save(fsync=self.flusher.fsync)
+                    self.session_log.flush(fsync=self.flusher.fsync)
+    
+    def _merge_external_events(self, own_events: List[Dict]):
+        """
+        Optimistic check before writing: fold in whatever other processes
+        logged since this instance last synced. `own_events` are already
+        applied in memory but not yet logged; after a full reload (another
+        process compacted) they are applied again on top of the fresh state.
+        Call with the file lock held.
+        """
+        external = self.event_log.read_new_events()
+        if external is None:
+            self.load_stats()
+            for event in own_events:
+                self._apply_event(event)
+            return
+        
+        for event in external:
+            self._apply_event(event)
+    
+    def _apply_event(self, event: Dict):
+        """Apply one logged mutation to the in-memory statistics"""
+        event_type = event['type']
+        
+        if event_type == 'session_time':
+            day = event['date']
+            if day not in self.data['daily_sessions']:
+                self.data['daily_sessions'][day] = 0
+            
+            self.data['daily_sessions'][day] += event['seconds']
+            self.aggregates.add_session(day, event['seconds'])
+            self.daily_series.add(day, event['seconds'])
+            self.data['total_study_time'] += event['seconds']
+            self.data['sessions_completed'] += 1
+            
+            if self.streaks.qualifies(self.daily_series.get(day)):
+                self.streaks.add_day(day)
+                self._sync_streaks()
+        
+        elif event_type == 'emotion_entry':
+            entry = event['entry']
+            timestamp = wall_seconds(datetime.fromisoformat(entry['timestamp']))
+            position = bisect_right(self.emotion_times, timestamp)
+            self.emotion_times.insert(position, timestamp)
+            self.data['emotion_history'].insert(position, entry)
+            
+            self.aggregates.add_emotion(timestamp, entry['risk_score'], entry['primary_emotion'])
+            self._age_out_emotions()
+        
+        elif event_type == 'completed_task':
+            self.data['completed_tasks'].append(event['entry'])
+    
+    def _age_out_emotions(self):
+        """Roll raw emotion entries past the retention window into hourly/daily buckets"""
+        # SQLite keeps every entry in its table, so expired entries are only dropped from memory
+        # (its emotion_rollups hold just the buckets imported from JSON)
+        rollups = self.data['emotion_rollups'] if self.store is None else {}
+        kept = EmotionRollups(rollups).age_out(self.data['emotion_history'])
+        
+        dropped = len(self.data['emotion_history']) - len(kept)
+        if dropped:
+            del self.emotion_times[:dropped]
+        self.data['emotion_history'] = kept
+    
+    def _index_emotion_times(self):
+        """Parse every stored timestamp once, sorting the history if it is out of order"""
+        history = self.data['emotion_history']
+        times = [wall_seconds(datetime.fromisoformat(e['timestamp'])) for e in history]
+        if any(later < earlier for earlier, later in zip(times, times[1:])):
+            order = sorted(range(len(times)), key=times.__getitem__)
+            times = [times[i] for i in order]
+            self.data['emotion_history'] = [history[i] for i in order]
+        self.emotion_times = times
+    
+    def _default_stats(self) -> Dict:
+        return {
+            'daily_sessions': {},
+            'completed_tasks': [],
+            'emotion_history': [],
+            'emotion_rollups': {'hourly': [], 'daily': []},
+            'total_study_time': 0,
+            'longest_streak': 0,
+            'current_streak': 0,
+            'last_study_date': None,
+            'sessions_completed': 0,
+            'total_breaks_taken': 0
+        }
     
     def get_today_stats(self) -> Dict:
         """Get today's statistics"""
@@ -100,17 +339,15 @@ class StatisticsManager:
         today = datetime.now().date()
         start_of_week = today - timedelta(days=today.weekday())
         
-        week_seconds = 0
+        week_days = self.aggregates.week_days(start_of_week)
+        week_seconds = self.aggregates.week_seconds.get(week_days[0][1], 0)
         daily_breakdown = []
         
-        for i in range(7):
-            day = start_of_week + timedelta(days=i)
-            day_str = day.strftime("%Y-%m-%d")
+        for day_name, day_str in week_days:
             day_seconds = self.data['daily_sessions'].get(day_str, 0)
-            week_seconds += day_seconds
             
             daily_breakdown.append({
-                'day': day.strftime("%A"),
+                'day': day_name,
                 'date': day_str,
                 'minutes': day_seconds // 60,
                 'formatted': self._format_time(day_seconds)
@@ -123,24 +360,66 @@ class StatisticsManager:
             'goal_progress': self._calculate_goal_progress(week_seconds, config.WEEKLY_GOAL_DEFAULT * 60)
         }
     
+    def get_month_stats(self) -> Dict:
+        """Get this month's statistics"""
+        month_seconds = self.aggregates.month_seconds.get(datetime.now().strftime("%Y-%m"), 0)
+        
+        return {
+            'total_minutes': month_seconds // 60,
+            'total_formatted': self._format_time(month_seconds)
+        }
+    
+    def get_daily_series(self, days: int = 30, end_date=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Dates (datetime64[D]) and study seconds for the `days` days ending at `end_date`"""
+        end = np.datetime64(end_date or datetime.now().date(), 'D')
+        return self.daily_series.window(end - (days - 1), end)
+    
+    def get_rolling_study_time(self, days: int = 30, window_days: int = 7, end_date=None) -> Tuple[np.ndarray, np.ndarray]:
+        """Trailing `window_days` study seconds for each of the last `days` days"""
+        end = np.datetime64(end_date or datetime.now().date(), 'D')
+        return self.daily_series.rolling_sum(end - (days - 1), end, window_days)
+    
+    def get_study_seconds_between(self, start_date, end_date) -> int:
+        """Total study seconds over an inclusive date range"""
+        return self.daily_series.range_sum(start_date, end_date)
+    
+    def get_study_heatmap(self, days: int = None, phase: str = 'focus') -> np.ndarray:
+        """Studied seconds by weekday (rows, Monday first) and hour of day, optionally over the last `days` days"""
+        since = wall_seconds(datetime.now() - timedelta(days=days)) if days else None
+        with self._lock:
+            return self.session_log.heatmap(phase=phase, since=since)
+    
     def get_streak_info(self) -> Dict:
         """Get streak information"""
+        # A streak not continued yesterday or today has ended, even though the last run is still stored
+        current_streak = self.streaks.streak_as_of(datetime.now().date())
         return {
-            'current_streak': self.data['current_streak'],
+            'current_streak': current_streak,
             'longest_streak': self.data['longest_streak'],
             'goal': config.STREAK_GOAL_DEFAULT,
-            'progress': (self.data['current_streak'] / config.STREAK_GOAL_DEFAULT) * 100
+            'progress': (current_streak / config.STREAK_GOAL_DEFAULT) * 100
+        }
+    
+    def get_streak_as_of(self, day) -> Dict:
+        """Current and longest streak as they stood on a past day ('YYYY-MM-DD', date or datetime64)"""
+        return {
+            'current_streak': self.streaks.streak_as_of(day),
+            'longest_streak': self.streaks.longest_as_of(day)
         }
     
     def get_emotion_insights(self, days: int = 7) -> Dict:
         """Get emotion insights"""
-        cutoff_date = datetime.now() - timedelta(days=days)
-        recent_emotions = [
-            e for e in self.data['emotion_history']
-            if datetime.fromisoformat(e['timestamp']) > cutoff_date
-        ]
+        if days == self.aggregates.window_days:
+            summary = self.aggregates.emotion_summary()
+        else:
+            # Under SQLite the buckets are the imported JSON history, older than every stored row
+            rollups = EmotionRollups(self.data['emotion_rollups'])
+            summary = EmotionRollups.summarize(
+                rollups.buckets_since(datetime.now() - timedelta(days=days)),
+                self._recent_emotions(days)
+            )
         
-        if not recent_emotions:
+        if not summary['count']:
             return {
                 'average_risk': 0,
                 'most_common_emotion': 'neutral',
@@ -148,18 +427,9 @@ class StatisticsManager:
                 'total_entries': 0
             }
         
-        avg_risk = sum(e['risk_score'] for e in recent_emotions) / len(recent_emotions)
-        
-        emotion_counts = {}
-        for entry in recent_emotions:
-            emotion = entry['primary_emotion']
-            emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-        
-        most_common = max(emotion_counts, key=emotion_counts.get) if emotion_counts else 'neutral'
-        
-        if len(recent_emotions) >= 2:
-            first_half_risk = sum(e['risk_score'] for e in recent_emotions[:len(recent_emotions)//2]) / (len(recent_emotions)//2)
-            second_half_risk = sum(e['risk_score'] for e in recent_emotions[len(recent_emotions)//2:]) / (len(recent_emotions)//2)
+        if 'first_half_risk' in summary:
+            first_half_risk = summary['first_half_risk']
+            second_half_risk = summary['second_half_risk']
             
             if second_half_risk < first_half_risk - 10:
                 trend = 'improving'
@@ -171,39 +441,69 @@ class StatisticsManager:
             trend = 'insufficient_data'
         
         return {
-            'average_risk': avg_risk,
-            'most_common_emotion': most_common,
+            'average_risk': summary['average_risk'],
+            'most_common_emotion': summary['most_common_emotion'],
             'trend': trend,
-            'total_entries': len(recent_emotions)
+            'total_entries': summary['count']
         }
     
-    def _update_streak(self):
-        """Update study streak"""
-        today = datetime.now().date()
-        today_str = today.strftime("%Y-%m-%d")
-        
-        if self.data['daily_sessions'].get(today_str, 0) < 600:
-            return
-        
-        last_date_str = self.data.get('last_study_date')
-        
-        if last_date_str:
-            last_date = datetime.strptime(last_date_str, "%Y-%m-%d").date()
-            days_diff = (today - last_date).days
-            
-            if days_diff == 1:
-                self.data['current_streak'] += 1
-            elif days_diff == 0:
-                pass
-            else:
-                self.data['current_streak'] = 1
+    def check_aggregates(self, repair: bool = True) -> List[str]:
+        """Recompute the aggregates from raw data and list the ones that had drifted"""
+        if self.store is not None:
+            self.flush()
+            daily_sessions = self.store.get_daily_seconds("0000-01-01", "9999-12-31")
         else:
-            self.data['current_streak'] = 1
+            daily_sessions = self.data['daily_sessions']
         
-        if self.data['current_streak'] > self.data['longest_streak']:
-            self.data['longest_streak'] = self.data['current_streak']
+        fresh = StatsAggregates(self.aggregates.window_days, self.aggregates.max_window_entries)
+        fresh.rebuild(daily_sessions, *self._raw_window_emotions())
         
-        self.data['last_study_date'] = today_str
+        expected = fresh.snapshot()
+        actual = self.aggregates.snapshot()
+        drifted = [
+            name for name in expected
+            if (abs(expected[name] - actual[name]) > 1e-6 if name == 'emotion_risk_sum'
+                else expected[name] != actual[name])
+        ]
+        
+        if drifted and repair:
+            self.aggregates = fresh
+        return drifted
+    
+    def _recent_emotions(self, days: int) -> List[Dict]:
+        """Emotion entries newer than `days` ago, oldest first, read from raw data"""
+        cutoff_date = datetime.now() - timedelta(days=days)
+        if self.store is not None:
+            self.flush()
+            return self.store.get_emotions_since(cutoff_date.isoformat())
+        start = bisect_right(self.emotion_times, wall_seconds(cutoff_date))
+        return self.data['emotion_history'][start:]
+    
+    def _raw_window_emotions(self) -> Tuple[List[Dict], Optional[List[float]]]:
+        """Entries in the rolling window and, when they come from memory, their epoch times"""
+        if self.store is not None:
+            return self._recent_emotions(self.aggregates.window_days), None
+        cutoff_date = datetime.now() - timedelta(days=self.aggregates.window_days)
+        start = bisect_right(self.emotion_times, wall_seconds(cutoff_date))
+        return self.data['emotion_history'][start:], self.emotion_times[start:]
+    
+    def get_emotion_timeline(self, limit: int = 14) -> Tuple[np.ndarray, List[Dict]]:
+        """The most recent emotion entries with their times as a datetime64 array"""
+        times = np.array(self.emotion_times[-limit:], dtype=np.float64)
+        return (times * 1e6).astype('datetime64[us]'), self.data['emotion_history'][-limit:]
+    
+    def recompute_streaks(self):
+        """Rebuild the streaks from every recorded day, e.g. after back-dated or bulk changes"""
+        with self._lock:
+            self.streaks.rebuild(self.daily_series)
+            self._sync_streaks()
+    
+    def _sync_streaks(self):
+        """Copy the engine's view into the persisted streak fields"""
+        current, last_day = self.streaks.last_run()
+        self.data['current_streak'] = current
+        self.data['longest_streak'] = self.streaks.longest
+        self.data['last_study_date'] = last_day
     
     def _format_time(self, seconds: int) -> str:
         """Format seconds to readable time"""
@@ -226,16 +526,16 @@ class StatisticsManager:
             filename = os.path.join(config.DATA_DIR, f"study_stats_{datetime.now().strftime('%Y%m%d')}.csv")
         
         import csv
+        from .export_engine import ExportEngine
         
         with open(filename, 'w', newline='') as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(['Date', 'Study Time (minutes)', 'Sessions'])
             
-            for date, seconds in sorted(self.data['daily_sessions'].items()):
-                minutes = seconds // 60
-                writer.writerow([date, minutes, ''])
+            for chunk in ExportEngine(self).iter_chunks('sessions'):
+                writer.writerows(
+                    (date, minutes, sessions if sessions is not None else '')
+                    for date, minutes, _, sessions in chunk
+                )
         
         return filename
-=======
-
->>>>>>> 6016f1ed5b98e59f92aab31ec076f93a5d93cd69
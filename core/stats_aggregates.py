@@ -0,0 +1,141 @@
+"""
+Incrementally Maintained Statistics Aggregates
+"""
+
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Any
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+EPOCH = datetime(1970, 1, 1)
+
+def wall_seconds(moment: datetime) -> float:
+    """Seconds since 1970 on the naive local clock, matching how timestamps are stored"""
+    return (moment - EPOCH).total_seconds()
+
+class StatsAggregates:
+    """Weekly, monthly and rolling-window emotion totals kept up to date on every write"""
+
+    def __init__(self, window_days: int = None, max_window_entries: Optional[int] = None):
+        self.window_days = window_days or config.STATS_ROLLING_WINDOW_DAYS
+        self.max_window_entries = max_window_entries
+        self.reset()
+
+    def reset(self):
+        self.week_seconds: Dict[str, int] = {}
+        self.month_seconds: Dict[str, int] = {}
+
+        self._times: List[float] = []
+        self._labels: List[Optional[str]] = []
+        self._prefix: List[float] = [0.0]
+        self._head = 0
+        self.label_counts: Counter = Counter()
+        self._week_days_cache = (None, None)
+
+    def rebuild(self, daily_sessions: Dict[str, int], emotion_entries: List[Dict],
+                emotion_times: Optional[List[float]] = None):
+        """Recompute every aggregate from raw data; `emotion_times` skips re-parsing timestamps"""
+        self.reset()
+        for day, seconds in daily_sessions.items():
+            self.add_session(day, seconds)
+
+        if emotion_times is None:
+            emotion_times = [wall_seconds(datetime.fromisoformat(e['timestamp'])) for e in emotion_entries]
+
+        cutoff = wall_seconds(datetime.now() - timedelta(days=self.window_days))
+        for entry, timestamp in zip(emotion_entries, emotion_times):
+            if timestamp > cutoff:
+                self.add_emotion(timestamp, entry['risk_score'], entry['primary_emotion'])
+
+    # Study time --------------------------------------------------------------
+
+    def add_session(self, day: str, seconds: int):
+        date = datetime.strptime(day, "%Y-%m-%d").date()
+        week_key = (date - timedelta(days=date.weekday())).strftime("%Y-%m-%d")
+        self.week_seconds[week_key] = self.week_seconds.get(week_key, 0) + seconds
+        self.month_seconds[day[:7]] = self.month_seconds.get(day[:7], 0) + seconds
+
+    def week_days(self, start_of_week) -> List[tuple]:
+        """(day name, date string) for the seven days of a week, computed once per week"""
+        cached_start, cached_days = self._week_days_cache
+        if cached_start != start_of_week:
+            cached_days = [
+                ((start_of_week + timedelta(days=i)).strftime("%A"),
+                 (start_of_week + timedelta(days=i)).strftime("%Y-%m-%d"))
+                for i in range(7)
+            ]
+            self._week_days_cache = (start_of_week, cached_days)
+        return cached_days
+
+    # Emotions ----------------------------------------------------------------
+
+    def add_emotion(self, timestamp: float, risk_score: float, label: Optional[str]):
+        self._times.append(timestamp)
+        self._labels.append(label)
+        self._prefix.append(self._prefix[-1] + risk_score)
+        self.label_counts[label] += 1
+
+        if self.max_window_entries is not None:
+            while len(self._times) - self._head > self.max_window_entries:
+                self._evict_head()
+
+    def emotion_summary(self, now: datetime = None) -> Dict[str, Any]:
+        """Count, average risk, half averages and most common label over the rolling window"""
+        now = now or datetime.now()
+        cutoff = wall_seconds(now - timedelta(days=self.window_days))
+        while self._head < len(self._times) and self._times[self._head] <= cutoff:
+            self._evict_head()
+
+        count = len(self._times) - self._head
+        if count == 0:
+            return {'count': 0}
+
+        base = self._prefix[self._head]
+        half = count // 2
+        summary = {
+            'count': count,
+            'average_risk': (self._prefix[-1] - base) / count,
+            'most_common_emotion': self._most_common_label()
+        }
+        if half:
+            middle = self._prefix[self._head + half]
+            summary['first_half_risk'] = (middle - base) / half
+            summary['second_half_risk'] = (self._prefix[-1] - middle) / half
+        return summary
+
+    def _most_common_label(self) -> Optional[str]:
+        top = max(self.label_counts.values())
+        tied = [label for label, n in self.label_counts.items() if n == top]
+        if len(tied) == 1:
+            return tied[0]
+        # Break ties by first appearance in the window, like a fresh count would
+        tied = set(tied)
+        return next(label for label in self._labels[self._head:] if label in tied)
+
+    def _evict_head(self):
+        label = self._labels[self._head]
+        self.label_counts[label] -= 1
+        if self.label_counts[label] == 0:
+            del self.label_counts[label]
+        self._head += 1
+
+        # Drop the evicted prefix once it dominates the arrays
+        if self._head > 64 and self._head * 2 > len(self._times):
+            self._times = self._times[self._head:]
+            self._labels = self._labels[self._head:]
+            self._prefix = self._prefix[self._head:]
+            self._head = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Comparable view of the aggregates for consistency checks"""
+        summary = self.emotion_summary()
+        return {
+            'week_seconds': {k: v for k, v in self.week_seconds.items() if v},
+            'month_seconds': {k: v for k, v in self.month_seconds.items() if v},
+            'emotion_count': summary['count'],
+            'emotion_risk_sum': summary.get('average_risk', 0) * summary['count'],
+            'label_counts': dict(self.label_counts)
+        }
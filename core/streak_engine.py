@@ -0,0 +1,103 @@
+"""
+Study Streaks Computed from the Day Series
+"""
+
+from typing import Optional, Tuple
+import numpy as np
+import os
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from .daily_series import DailySeries, DayLike, day_ordinal
+
+class StreakEngine:
+    """Study streaks as sorted runs of consecutive qualifying days"""
+
+    def __init__(self, min_seconds: int = None):
+        self.min_seconds = min_seconds if min_seconds is not None else config.STREAK_MIN_SECONDS
+        self.run_starts = np.zeros(0, dtype=np.int64)
+        self.run_ends = np.zeros(0, dtype=np.int64)
+        self.longest = 0
+
+    def rebuild(self, series: DailySeries):
+        """Recompute every run from the per-day totals"""
+        dates, seconds, _ = series.recorded_days()
+        days = dates[seconds >= self.min_seconds].astype(np.int64)
+        if not len(days):
+            self.run_starts = np.zeros(0, dtype=np.int64)
+            self.run_ends = np.zeros(0, dtype=np.int64)
+            self.longest = 0
+            return
+
+        breaks = np.flatnonzero(np.diff(days) > 1)
+        self.run_starts = days[np.concatenate([[0], breaks + 1])]
+        self.run_ends = days[np.concatenate([breaks, [len(days) - 1]])]
+        self.longest = int((self.run_ends - self.run_starts).max()) + 1
+
+    def add_day(self, day: DayLike):
+        """Mark one day as qualifying, joining it to the neighbouring runs"""
+        ordinal = day_ordinal(day)
+        after = int(np.searchsorted(self.run_starts, ordinal, side='right'))
+        before = after - 1
+        if before >= 0 and self.run_ends[before] >= ordinal:
+            return
+
+        joins_before = before >= 0 and self.run_ends[before] == ordinal - 1
+        joins_after = after < len(self.run_starts) and self.run_starts[after] == ordinal + 1
+        if joins_before and joins_after:
+            self.run_ends[before] = self.run_ends[after]
+            self.run_starts = np.delete(self.run_starts, after)
+            self.run_ends = np.delete(self.run_ends, after)
+            changed = before
+        elif joins_before:
+            self.run_ends[before] = ordinal
+            changed = before
+        elif joins_after:
+            self.run_starts[after] = ordinal
+            changed = after
+        else:
+            self.run_starts = np.insert(self.run_starts, after, ordinal)
+            self.run_ends = np.insert(self.run_ends, after, ordinal)
+            changed = after
+        self.longest = max(self.longest, int(self.run_ends[changed] - self.run_starts[changed]) + 1)
+
+    def qualifies(self, seconds: int) -> bool:
+        return seconds >= self.min_seconds
+
+    # Queries ---------------------------------------------------------------
+
+    def streak_as_of(self, day: DayLike, grace_days: int = 1) -> int:
+        """
+        Length of the streak alive on `day`. A streak whose last day is at
+        most `grace_days` earlier still counts, so today's streak does not
+        drop to zero before today's session.
+        """
+        ordinal = day_ordinal(day)
+        index = int(np.searchsorted(self.run_starts, ordinal, side='right')) - 1
+        if index < 0:
+            return 0
+        end = min(int(self.run_ends[index]), ordinal)
+        if ordinal - end > grace_days:
+            return 0
+        return end - int(self.run_starts[index]) + 1
+
+    def longest_as_of(self, day: DayLike) -> int:
+        """Longest streak using only days up to and including `day`"""
+        ordinal = day_ordinal(day)
+        count = int(np.searchsorted(self.run_starts, ordinal, side='right'))
+        if not count:
+            return 0
+        lengths = np.minimum(self.run_ends[:count], ordinal) - self.run_starts[:count] + 1
+        return int(lengths.max())
+
+    def last_run(self) -> Tuple[int, Optional[str]]:
+        """Length and last day ('YYYY-MM-DD') of the most recent run"""
+        if not len(self.run_ends):
+            return 0, None
+        length = int(self.run_ends[-1] - self.run_starts[-1]) + 1
+        return length, str(np.datetime64(int(self.run_ends[-1]), 'D'))
+
+    def gaps(self) -> Tuple[np.ndarray, np.ndarray]:
+        """First day (datetime64[D]) and length in days of every break between runs"""
+        starts = self.run_ends[:-1] + 1
+        return starts.astype('datetime64[D]'), self.run_starts[1:] - starts
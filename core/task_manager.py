@@ -1,71 +1,368 @@
-<<<<<<< HEAD
+import csv
+import io
 import json
 import os
+import threading
+from bisect import bisect_left, insort
 from datetime import datetime
-from typing import List, Dict
+from typing import Iterable, List, Dict, Tuple, Union
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from .sqlite_store import get_sqlite_store
+from .write_behind import WriteBehind, atomic_write_json
+from .user_store import FileLock, file_version, user_data_dir, user_path
+
+# Display order of the priority view; unknown priorities sort after Low
+PRIORITIES = ['High', 'Normal', 'Low']
+
+def _priority_key(task: Dict) -> Tuple:
+    rank = PRIORITIES.index(task['priority']) if task['priority'] in PRIORITIES else len(PRIORITIES)
+    return (rank, task['created_at'], task['id'])
 
 class TaskManager:
-    def __init__(self):
-        self.tasks_file = os.path.join(config.DATA_DIR, "tasks.json")
-        self.tasks = self.load_tasks()
+    def __init__(self, user_id: str = None):
+        self.user_id = user_id
+        self.tasks_file = os.path.join(user_data_dir(user_id), "tasks.json")
+        self.file_lock = FileLock(f"{self.tasks_file}.lock")
+        self.store = (get_sqlite_store(user_path(user_id, config.SQLITE_DB_FILE))
+                      if config.STORAGE_BACKEND == "sqlite" else None)
+        
+        # Tasks by id (kept in id order), the pending subset, and the pending
+        # tasks' sort keys in priority order, all updated in O(1)/O(log n)
+        self._by_id: Dict[int, Dict] = {}
+        self._pending: Dict[int, Dict] = {}
+        self._priority_view: List[Tuple] = []
+        # Never hands out an id twice, even after the highest task is deleted
+        self._next_id = 1
+        
+        self._lock = threading.RLock()
+        self._dirty_ids = set()
+        self._deleted_ids = set()
+        # What this instance last read or wrote, to detect other writers at flush time
+        self._version = None
+        self._base_ids = set()
+        self.flusher = WriteBehind(self._flush_pending, "tasks")
+        self.load_tasks()
+    
+    @property
+    def tasks(self) -> List[Dict]:
+        """Every task in id order"""
+        return list(self._by_id.values())
     
     def load_tasks(self) -> List[Dict]:
-        """Load tasks from file"""
+        """Load tasks from the configured storage backend"""
+        renumbered = []
+        with self._lock, self.file_lock:
+            if self.store is not None:
+                try:
+                    if not self.store.has_tasks():
+                        legacy_tasks, legacy_next_id = self._load_json_tasks()
+                        self._renumber_duplicate_ids(legacy_tasks)
+                        self.store.import_tasks(legacy_tasks, max(legacy_next_id,
+                                                                  max((t['id'] for t in legacy_tasks), default=0) + 1))
+                    tasks = self.store.load_tasks()
+                    self._next_id = max(self._next_id, self.store.get_meta('next_task_id', 1))
+                except Exception as e:
+                    print(f"Error loading tasks: {e}")
+                    tasks = []
+            else:
+                self._version = file_version(self.tasks_file)
+                tasks, next_id = self._load_json_tasks()
+                self._next_id = max(self._next_id, next_id)
+                renumbered = self._renumber_duplicate_ids(tasks)
+                self._dirty_ids.update(task['id'] for task in renumbered)
+            self._set_tasks(tasks)
+            self._base_ids = set(self._by_id) - self._dirty_ids
+        if renumbered:
+            self.flusher.mark_dirty()
+        return self.tasks
+    
+    @staticmethod
+    def _renumber_duplicate_ids(tasks: List[Dict]) -> List[Dict]:
+        """
+        Older files could repeat an id (ids used to be len + 1). Give every
+        task whose id already appeared earlier in the list a fresh id past the
+        highest one, and return the renumbered tasks.
+        """
+        seen = set()
+        next_id = max((task['id'] for task in tasks), default=0) + 1
+        renumbered = []
+        for task in tasks:
+            if task['id'] in seen:
+                task['id'] = next_id
+                next_id += 1
+                renumbered.append(task)
+            seen.add(task['id'])
+        if renumbered:
+            print(f"⚠️ Renumbered {len(renumbered)} tasks with duplicate ids")
+        return renumbered
+    
+    def _set_tasks(self, tasks: List[Dict]):
+        """Rebuild every index from a task list"""
+        self._by_id = {t['id']: t for t in sorted(tasks, key=lambda t: t['id'])}
+        self._pending = {task_id: t for task_id, t in self._by_id.items() if not t['completed']}
+        self._priority_view = sorted(_priority_key(t) for t in self._pending.values())
+        self._next_id = max(self._next_id, max(self._by_id, default=0) + 1)
+    
+    def _allocate_id(self) -> int:
+        task_id = self._next_id
+        self._next_id += 1
+        return task_id
+    
+    def _unindex_pending(self, task: Dict):
+        if self._pending.pop(task['id'], None) is not None:
+            key = _priority_key(task)
+            position = bisect_left(self._priority_view, key)
+            if position < len(self._priority_view) and self._priority_view[position] == key:
+                del self._priority_view[position]
+    
+    def _load_json_tasks(self) -> Tuple[List[Dict], int]:
+        """Load tasks and the next unused id from file"""
         if os.path.exists(self.tasks_file):
             try:
                 with open(self.tasks_file, 'r') as f:
-                    return json.load(f)
+                    saved = json.load(f)
+                # Older files are a bare task list without the id high-water mark
+                if isinstance(saved, list):
+                    return saved, 1
+                return saved['tasks'], saved.get('next_id', 1)
             except:
                 pass
-        return []
+        return [], 1
+    
+    def _write_json_tasks(self, fsync: bool = True):
+        """Rewrite the tasks file atomically, with the next unused id so deleted ids stay retired"""
+        atomic_write_json(self.tasks_file, {'next_id': self._next_id, 'tasks': self.tasks}, indent=2, fsync=fsync)
+        self._version = file_version(self.tasks_file)
     
     def save_tasks(self):
         """Save tasks to file"""
         try:
-            with open(self.tasks_file, 'w') as f:
-                json.dump(self.tasks, f, indent=2)
+            with self._lock, self.file_lock:
+                self._dirty_ids.clear()
+                self._deleted_ids.clear()
+                if self.store is not None:
+                    self.store.replace_tasks(self.tasks)
+                else:
+                    self._write_json_tasks()
+                self._base_ids = {t['id'] for t in self.tasks}
         except Exception as e:
             print(f"Error saving tasks: {e}")
     
+    def flush(self) -> bool:
+        """Write pending task changes to disk now"""
+        return self.flusher.flush()
+    
+    def get_persistence_stats(self) -> Dict:
+        """Get task flush counters"""
+        return self.flusher.get_stats()
+    
     def add_task(self, text: str, priority: str = "Normal") -> Dict:
         """Add a new task"""
+        with self._lock:
+            task = self._new_task(text, priority)
+            insort(self._priority_view, _priority_key(task))
+        self.flusher.mark_dirty()
+        return task
+    
+    def complete_task(self, task_id: int) -> bool:
+        """Mark task as completed"""
+        with self._lock:
+            task = self._by_id.get(task_id)
+            if task is None:
+                return False
+            self._complete(task)
+        self.flusher.mark_dirty()
+        return True
+    
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task"""
+        with self._lock:
+            self._delete(task_id)
+        self.flusher.mark_dirty()
+        return True
+    
+    # Batches: every change applies in memory, then one write persists the lot
+    
+    def add_tasks(self, items: Iterable[Union[str, Dict]], priority: str = "Normal") -> List[Dict]:
+        """Add many tasks; items are task texts or dicts with 'text' and optional 'priority'"""
+        with self._lock:
+            added = []
+            for item in items:
+                if isinstance(item, dict):
+                    added.append(self._new_task(item['text'], item.get('priority') or priority))
+                else:
+                    added.append(self._new_task(item, priority))
+            self._priority_view.extend(_priority_key(task) for task in added)
+            self._priority_view.sort()
+        if added:
+            self.flusher.mark_dirty()
+        return added
+    
+    def complete_tasks(self, task_ids: Iterable[int]) -> List[Dict]:
+        """Complete many tasks; returns the ones that were still pending"""
+        with self._lock:
+            completed = []
+            for task_id in task_ids:
+                task = self._by_id.get(task_id)
+                if task is not None and not task['completed']:
+                    self._complete(task)
+                    completed.append(task)
+        if completed:
+            self.flusher.mark_dirty()
+        return completed
+    
+    def delete_tasks(self, task_ids: Iterable[int]) -> int:
+        """Delete many tasks; returns how many existed"""
+        with self._lock:
+            deleted = sum(self._delete(task_id) for task_id in task_ids)
+        if deleted:
+            self.flusher.mark_dirty()
+        return deleted
+    
+    def import_tasks(self, content: str, fmt: str = "text", priority: str = "Normal") -> List[Dict]:
+        """
+        Add tasks from a text list (one task per line, blank lines skipped) or
+        from CSV with a 'text' (or 'task') column and an optional 'priority' column
+        """
+        if fmt == "csv":
+            items = []
+            for row in csv.DictReader(io.StringIO(content)):
+                row = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+                text = row.get('text') or row.get('task')
+                if text:
+                    row_priority = row.get('priority', '').title()
+                    items.append({'text': text, 'priority': row_priority if row_priority in PRIORITIES else priority})
+        else:
+            items = [line.strip() for line in content.splitlines() if line.strip()]
+        return self.add_tasks(items, priority)
+    
+    def _new_task(self, text: str, priority: str) -> Dict:
+        """Create and index a pending task, except in the priority view; call with the lock held"""
         task = {
-            'id': len(self.tasks) + 1,
+            'id': self._allocate_id(),
             'text': text,
             'priority': priority,
             'completed': False,
             'created_at': datetime.now().isoformat()
         }
-        self.tasks.append(task)
-        self.save_tasks()
+        self._by_id[task['id']] = task
+        self._pending[task['id']] = task
+        self._dirty_ids.add(task['id'])
         return task
     
-    def complete_task(self, task_id: int) -> bool:
-        """Mark task as completed"""
-        for task in self.tasks:
-            if task['id'] == task_id:
-                task['completed'] = True
-                task['completed_at'] = datetime.now().isoformat()
-                self.save_tasks()
-                return True
-        return False
+    def _complete(self, task: Dict):
+        self._unindex_pending(task)
+        task['completed'] = True
+        task['completed_at'] = datetime.now().isoformat()
+        self._dirty_ids.add(task['id'])
     
-    def delete_task(self, task_id: int) -> bool:
-        """Delete a task"""
-        self.tasks = [t for t in self.tasks if t['id'] != task_id]
-        self.save_tasks()
-        return True
+    def _delete(self, task_id: int) -> bool:
+        task = self._by_id.pop(task_id, None)
+        if task is not None:
+            self._unindex_pending(task)
+        self._deleted_ids.add(task_id)
+        return task is not None
+    
+    def get_task(self, task_id: int) -> Dict:
+        """Get one task by id, or None"""
+        return self._by_id.get(task_id)
     
     def get_pending_tasks(self) -> List[Dict]:
         """Get all pending tasks"""
-        return [t for t in self.tasks if not t['completed']]
+        if self.store is not None:
+            self.flush()
+            return self.store.get_pending_tasks()
+        with self._lock:
+            return list(self._pending.values())
+    
+    def get_prioritized_tasks(self, limit: int = None) -> List[Dict]:
+        """Pending tasks ordered High, Normal, Low, then oldest first"""
+        with self._lock:
+            return [self._pending[key[-1]] for key in self._priority_view[:limit]]
     
     def get_completed_tasks(self) -> List[Dict]:
         """Get all completed tasks"""
-        return [t for t in self.tasks if t['completed']]
-=======
-
->>>>>>> 6016f1ed5b98e59f92aab31ec076f93a5d93cd69
+        if self.store is not None:
+            self.flush()
+            return self.store.get_completed_tasks()
+        with self._lock:
+            return [t for t in self._by_id.values() if t['completed']]
+    
+    def _flush_pending(self):
+        """Write the changed rows to SQLite, or rewrite the JSON file atomically"""
+        with self._lock, self.file_lock:
+            dirty_ids, self._dirty_ids = self._dirty_ids, set()
+            deleted_ids, self._deleted_ids = self._deleted_ids, set()
+            
+            try:
+                if self.store is None:
+                    if file_version(self.tasks_file) != self._version:
+                        self._merge_from_disk(dirty_ids, deleted_ids)
+                    self._write_json_tasks(fsync=self.flusher.fsync)
+                    self._base_ids = set(self._by_id)
+                    return
+                
+                with self.store.transaction():
+                    self.store.delete_tasks(sorted(deleted_ids))
+                    new_tasks = [t for t in self._by_id.values() if t['id'] not in self._base_ids]
+                    # Ids below the stored high-water mark may belong to tasks another writer created and deleted
+                    stored_next_id = self.store.get_meta('next_task_id', 1)
+                    taken_ids = (self.store.existing_task_ids([t['id'] for t in new_tasks])
+                                 | {t['id'] for t in new_tasks if t['id'] < stored_next_id})
+                    if self._reassign_ids(new_tasks, taken_ids, max(self.store.max_task_id(), stored_next_id - 1)):
+                        self._set_tasks(self.tasks)
+                    self.store.update_tasks([dict(self._by_id[task_id]) for task_id in sorted(dirty_ids)
+                                             if task_id in self._by_id and task_id in self._base_ids])
+                    self.store.upsert_tasks([dict(t) for t in new_tasks])
+                    self.store.set_meta('next_task_id', max(self._next_id, self.store.get_meta('next_task_id', 1)))
+                self._base_ids = set(self._by_id)
+            except Exception:
+                self._dirty_ids |= dirty_ids
+                self._deleted_ids |= deleted_ids
+                raise
+    
+    def _merge_from_disk(self, dirty_ids: set, deleted_ids: set):
+        """
+        Another process rewrote the file since this instance last synced.
+        Rebuild the list from the file plus this instance's own changes:
+        edits to tasks that still exist, and new tasks (renumbered when another
+        writer took the same id). A deletion on either side wins.
+        """
+        new_tasks = [t for t in self._by_id.values() if t['id'] not in self._base_ids]
+        known = {task_id: t for task_id, t in self._by_id.items() if task_id in self._base_ids}
+        saved_tasks, disk_next_id = self._load_json_tasks()
+        disk_tasks = []
+        for disk_task in saved_tasks:
+            task_id = disk_task['id']
+            if task_id in deleted_ids:
+                continue
+            task = known.get(task_id)
+            if task is None:
+                task = disk_task
+            elif task_id not in dirty_ids:
+                # Refresh in place so task dicts callers hold stay current
+                task.clear()
+                task.update(disk_task)
+            disk_tasks.append(task)
+        
+        self._base_ids = {t['id'] for t in disk_tasks}
+        self._next_id = max(self._next_id, disk_next_id)
+        # Ids below the other writer's high-water mark may belong to tasks it created and deleted
+        taken_ids = self._base_ids | {t['id'] for t in new_tasks if t['id'] < disk_next_id}
+        self._reassign_ids(new_tasks, taken_ids, max(max(self._base_ids, default=0), disk_next_id - 1))
+        self._set_tasks(disk_tasks + new_tasks)
+    
+    def _reassign_ids(self, new_tasks: List[Dict], taken_ids: set, max_id: int) -> bool:
+        """
+        Give new tasks whose id another writer already used the next free ids.
+        Returns whether any id changed; the caller then rebuilds the indexes.
+        """
+        if not taken_ids & {t['id'] for t in new_tasks}:
+            return False
+        self._next_id = max(self._next_id, max_id + 1)
+        for task in new_tasks:
+            if task['id'] in taken_ids:
+                task['id'] = self._allocate_id()
+        return True
@@ -0,0 +1,101 @@
+"""
+Per-User Data Directories and Cross-Process File Locking
+"""
+
+import hashlib
+import os
+import re
+import threading
+from typing import Optional, Tuple
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+USER_ID_PATTERN = re.compile(r'[^A-Za-z0-9_-]+')
+
+def user_dir_name(user_id: str) -> str:
+    """
+    Directory name for a user id: a readable slug plus a hash of the exact id.
+    The slug alone is lossy ("a b", "a/b" and "a_b" share one), the hash keeps
+    every distinct id in its own directory.
+    """
+    raw = str(user_id)
+    slug = USER_ID_PATTERN.sub('_', raw).strip('_')[:40] or 'user'
+    digest = hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+    return f"{slug}-{digest}"
+
+def user_data_dir(user_id: Optional[str] = None) -> str:
+    """Directory holding one user's files; no user id means the shared legacy DATA_DIR"""
+    if not user_id:
+        return config.DATA_DIR
+    # Resolved against the current DATA_DIR, not the one config.USERS_DIR was built from
+    path = os.path.join(config.DATA_DIR, os.path.basename(config.USERS_DIR), user_dir_name(user_id))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def user_path(user_id: Optional[str], default_path: str) -> str:
+    """Place a configured data file inside the user's directory"""
+    if not user_id:
+        return default_path
+    return os.path.join(user_data_dir(user_id), os.path.basename(default_path))
+
+def file_version(path: str) -> Optional[Tuple[int, int, int]]:
+    """
+    Identity of a file's current contents. Every atomic rewrite replaces the
+    inode, so a changed token means another writer got there first.
+    """
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+class FileLock:
+    """Exclusive advisory file lock shared by threads and processes, re-entrant within a thread"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        if self._depth == 0:
+            try:
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+                if fcntl is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_EX)
+                else:
+                    msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+            except Exception:
+                if self._fd is not None:
+                    os.close(self._fd)
+                    self._fd = None
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._depth -= 1
+        try:
+            if self._depth == 0:
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(self._fd, fcntl.LOCK_UN)
+                    else:
+                        os.lseek(self._fd, 0, os.SEEK_SET)
+                        msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+                finally:
+                    os.close(self._fd)
+                    self._fd = None
+        finally:
+            self._thread_lock.release()
+        return False
@@ -0,0 +1,181 @@
+"""
+Debounced Write-Behind Persistence
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+import weakref
+from typing import Callable, Dict, Any
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from .event_log import _fsync_directory
+
+POLICIES = ['immediate', 'debounced', 'relaxed']
+
+# Shortest wait before retrying a failed background flush, even with a zero debounce
+RETRY_MIN_SECONDS = 0.1
+
+# Every live flusher, so pending writes are flushed once at interpreter exit
+_flushers = weakref.WeakSet()
+
+class WriteBehind:
+    """Coalesces bursts of mutations into one debounced background write"""
+
+    def __init__(self, flush_fn: Callable[[], None], name: str, policy: str = None,
+                 debounce_seconds: float = None, max_delay_seconds: float = None):
+        self.flush_fn = flush_fn
+        self.name = name
+        self.policy = policy or config.PERSIST_POLICY
+        if self.policy not in POLICIES:
+            print(f"⚠️ Unknown persistence policy '{self.policy}', using debounced")
+            self.policy = 'debounced'
+        self.debounce_seconds = debounce_seconds if debounce_seconds is not None else config.PERSIST_DEBOUNCE_SECONDS
+        self.max_delay_seconds = max_delay_seconds if max_delay_seconds is not None else config.PERSIST_MAX_DELAY_SECONDS
+
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._pending_marks = 0
+        self._dirty_since = None
+        self._last_mark = None
+        self._retry_delay = 0.0
+        self._retry_at = None
+        self._thread = None
+        self._closed = False
+
+        self.marks = 0
+        self.flushes = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.last_flush_seconds = 0.0
+
+        _flushers.add(self)
+
+    @property
+    def fsync(self) -> bool:
+        return self.policy != 'relaxed'
+
+    def mark_dirty(self):
+        """Record that state changed; the write happens later unless the policy is immediate"""
+        with self._cond:
+            now = time.monotonic()
+            self.marks += 1
+            self._pending_marks += 1
+            if self._dirty_since is None:
+                self._dirty_since = now
+            self._last_mark = now
+
+            if self.policy != 'immediate':
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=f"write-behind-{self.name}", daemon=True)
+                    self._thread.start()
+                self._cond.notify()
+                return
+
+        self.flush()
+
+    def flush(self) -> bool:
+        """Write now if anything is dirty; returns whether a write happened"""
+        with self._flush_lock:
+            with self._cond:
+                marks = self._pending_marks
+                if not marks:
+                    return False
+                self._pending_marks = 0
+                self._dirty_since = None
+
+            start = time.perf_counter()
+            try:
+                self.flush_fn()
+            except Exception as e:
+                print(f"Error saving {self.name}: {e}")
+                with self._cond:
+                    now = time.monotonic()
+                    self.errors += 1
+                    # Keep the state dirty so a later flush retries, backing off while it keeps failing
+                    self._pending_marks += marks
+                    self._dirty_since = self._dirty_since or now
+                    self._last_mark = now
+                    delay = max(self._retry_delay * 2, self.debounce_seconds, RETRY_MIN_SECONDS)
+                    self._retry_delay = min(delay, max(self.max_delay_seconds, RETRY_MIN_SECONDS))
+                    self._retry_at = now + self._retry_delay
+                return False
+
+            with self._cond:
+                self._retry_delay = 0.0
+                self._retry_at = None
+                self.flushes += 1
+                self.coalesced += marks - 1
+                self.last_flush_seconds = time.perf_counter() - start
+            return True
+
+    def close(self):
+        """Flush outstanding changes and stop the background thread"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=self.max_delay_seconds + 1)
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get flush counters"""
+        with self._cond:
+            return {
+                'policy': self.policy,
+                'marks': self.marks,
+                'flushes': self.flushes,
+                'coalesced_writes': self.coalesced,
+                'pending': self._pending_marks,
+                'errors': self.errors,
+                'retry_delay_ms': self._retry_delay * 1000,
+                'last_flush_ms': self.last_flush_seconds * 1000
+            }
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if self._dirty_since is None:
+                        # Nothing pending: exit, and let the next mark start a new thread
+                        self._thread = None
+                        return
+                    deadline = min(self._last_mark + self.debounce_seconds,
+                                   self._dirty_since + self.max_delay_seconds)
+                    if self._retry_at is not None:
+                        deadline = max(deadline, self._retry_at)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    self._thread = None
+                    return
+            self.flush()
+
+
+def atomic_write_json(path: str, data, indent: int = None, fsync: bool = True):
+    """Write JSON to a temp file and rename it over `path`, so readers never see a partial file"""
+    tmp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_file, 'w') as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_file, path)
+        if fsync:
+            _fsync_directory(os.path.dirname(path))
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+@atexit.register
+def _flush_all():
+    for flusher in list(_flushers):
+        flusher.close()
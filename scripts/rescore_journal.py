@@ -0,0 +1,207 @@
+"""
+Offline bulk re-analysis of a journal archive
+
+Streams JSONL or CSV journal entries, shards them across a process pool with
+one EmotionAnalyzer per worker (batched inference inside each), and appends
+results to a JSONL file as they complete. Progress is checkpointed after every
+chunk, so an interrupted run resumes where it stopped; only a bounded number
+of chunks is ever in flight, so memory does not grow with the archive size.
+
+Usage:
+    python scripts/rescore_journal.py entries.jsonl rescored.jsonl
+    python scripts/rescore_journal.py entries.csv rescored.jsonl --text-field entry --workers 8
+    python scripts/rescore_journal.py entries.jsonl rescored.jsonl --resume
+"""
+
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from itertools import islice
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+_analyzer = None
+_batch_size = 16
+
+
+def read_records(path: str, input_format: str):
+    """Yield journal records one at a time from a JSONL or CSV file"""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        if input_format == 'csv':
+            for row in csv.DictReader(f):
+                yield row
+        else:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+
+def iter_chunks(records, chunk_size: int, text_field: str, id_field: str, keep_fields, start_index: int):
+    """Group records into (index, id, text, kept fields) chunks for the workers"""
+    index = start_index
+    while True:
+        chunk = []
+        for record in islice(records, chunk_size):
+            kept = {field: record[field] for field in keep_fields if field in record}
+            chunk.append((index, record.get(id_field, index), record.get(text_field) or '', kept))
+            index += 1
+        if not chunk:
+            return
+        yield chunk
+
+
+def init_worker(model_path: str, backend: str, batch_size: int, threads: int):
+    """Load one analyzer per worker process"""
+    global _analyzer, _batch_size
+    import torch
+    torch.set_num_threads(threads)
+
+    config.MODEL_PATH = model_path
+    config.EMOTION_BACKEND = backend
+    config.EMOTION_CACHE_PERSIST = False
+    # Every rescored entry must come from the model, never from the lexicon shortcut
+    config.EMOTION_FAST_PATH = False
+
+    from core.emotion_analyzer import EmotionAnalyzer
+    _analyzer = EmotionAnalyzer()
+    if not _analyzer.load_model():
+        raise RuntimeError(f"Worker could not load the model: {_analyzer.load_error}")
+    _batch_size = batch_size
+
+
+def score_chunk(chunk):
+    """Score a chunk of entries in batches and return output records in input order"""
+    results = _analyzer.analyze_emotions_batch([text for _, _, text, _ in chunk], batch_size=_batch_size)
+
+    records = []
+    for (index, entry_id, _, kept), result in zip(chunk, results):
+        record = {'id': entry_id, 'index': index, 'model': config.EMOTION_MODEL}
+        record.update(kept)
+        if result is None:
+            record.update({'risk_score': None, 'primary_emotion': None, 'emotions': [], 'stage': None})
+        else:
+            record.update({
+                'risk_score': result['risk_score'],
+                'primary_emotion': result['primary_emotion']['emotion'] if result['primary_emotion'] else None,
+                'stage': result.get('stage'),
+                'emotions': [
+                    {'emotion': e['emotion'], 'confidence': e['confidence']} for e in result['emotions']
+                ]
+            })
+        records.append(record)
+    return records
+
+
+def load_checkpoint(checkpoint_path: str):
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path, 'r') as f:
+            return json.load(f)
+    return {'records_done': 0, 'output_bytes': 0}
+
+
+def save_checkpoint(checkpoint_path: str, records_done: int, output_bytes: int):
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({
+            'records_done': records_done,
+            'output_bytes': output_bytes,
+            'model': config.EMOTION_MODEL,
+            'updated_at': time.time()
+        }, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input', help="Journal archive (.jsonl or .csv)")
+    parser.add_argument('output', help="Output JSONL file")
+    parser.add_argument('--format', choices=['jsonl', 'csv'], help="Input format (default: from extension)")
+    parser.add_argument('--text-field', default='text', help="Field holding the journal text")
+    parser.add_argument('--id-field', default='id', help="Field holding the entry id (default: input position)")
+    parser.add_argument('--keep-fields', nargs='*', default=['timestamp'], help="Input fields copied to the output")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument('--chunk-size', type=int, default=256, help="Entries sent to a worker at a time")
+    parser.add_argument('--batch-size', type=int, default=16, help="Texts per forward pass inside a worker")
+    parser.add_argument('--model-path', default=config.MODEL_PATH, help="Local model directory")
+    parser.add_argument('--backend', default=config.EMOTION_BACKEND, help="Inference backend")
+    parser.add_argument('--resume', action='store_true', help="Continue from the last checkpoint")
+    args = parser.parse_args()
+
+    input_format = args.format or ('csv' if args.input.lower().endswith('.csv') else 'jsonl')
+    checkpoint_path = f"{args.output}.checkpoint.json"
+
+    checkpoint = {'records_done': 0, 'output_bytes': 0}
+    if args.resume:
+        checkpoint = load_checkpoint(checkpoint_path)
+        print(f"🔁 Resuming after {checkpoint['records_done']} entries")
+    elif os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    # Drop anything written after the last checkpoint, then append
+    output_mode = 'r+' if args.resume and os.path.exists(args.output) else 'w'
+    output = open(args.output, output_mode, encoding='utf-8')
+    output.truncate(checkpoint['output_bytes'])
+    output.seek(checkpoint['output_bytes'])
+
+    records = read_records(args.input, input_format)
+    for _ in islice(records, checkpoint['records_done']):
+        pass
+
+    chunks = iter_chunks(
+        records,
+        args.chunk_size,
+        args.text_field,
+        args.id_field,
+        args.keep_fields,
+        checkpoint['records_done']
+    )
+
+    workers = max(1, args.workers)
+    threads_per_worker = max(1, (os.cpu_count() or 1) // workers)
+    records_done = checkpoint['records_done']
+    started = time.time()
+
+    with multiprocessing.get_context('spawn').Pool(
+        workers,
+        initializer=init_worker,
+        initargs=(args.model_path, args.backend, args.batch_size, threads_per_worker)
+    ) as pool:
+        in_flight = deque()
+        max_in_flight = workers * 2
+
+        def drain_oldest():
+            nonlocal records_done
+            scored = in_flight.popleft().get()
+            for record in scored:
+                output.write(json.dumps(record) + '\n')
+            output.flush()
+            os.fsync(output.fileno())
+            records_done += len(scored)
+            save_checkpoint(checkpoint_path, records_done, output.tell())
+
+            elapsed = time.time() - started
+            rate = (records_done - checkpoint['records_done']) / elapsed if elapsed else 0
+            print(f"\r📊 {records_done} entries scored ({rate:.1f}/s)", end='', flush=True)
+
+        for chunk in chunks:
+            in_flight.append(pool.apply_async(score_chunk, (chunk,)))
+            if len(in_flight) >= max_in_flight:
+                drain_oldest()
+
+        while in_flight:
+            drain_oldest()
+
+    output.close()
+    print(f"\n✅ Done: {records_done} entries written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""
+Multi-process stress test for the per-user data store
+
+Starts several worker processes per user that all write to the same user's
+statistics and tasks at once: study sessions, emotion entries, new tasks and
+completions, with short debounce intervals and a tiny event-log size limit so
+flushes and compactions from different processes interleave constantly.
+Afterwards the files are reopened and checked against what the workers did:
+every session and task must be present exactly once, with unique task ids.
+Runs against a temporary data directory and exits non-zero on any mismatch.
+
+Usage:
+    python scripts/stress_data_store.py
+    python scripts/stress_data_store.py --users 3 --workers 6 --ops 300 --backend sqlite
+"""
+
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+
+SESSION_SECONDS = 60
+
+
+def configure(data_dir: str, backend: str):
+    """Point every data file at the scratch directory (must run before the managers are imported)"""
+    config.DATA_DIR = data_dir
+    config.USERS_DIR = os.path.join(data_dir, "users")
+    config.SQLITE_DB_FILE = os.path.join(data_dir, "study.db")
+    config.DAILY_SERIES_FILE = os.path.join(data_dir, "daily_seconds.npz")
+    config.SESSION_LOG_FILE = os.path.join(data_dir, "sessions.bin")
+    config.STORAGE_BACKEND = backend
+    config.EVENT_LOG_MAX_BYTES = 4096
+    config.PERSIST_DEBOUNCE_SECONDS = 0.01
+    config.PERSIST_MAX_DELAY_SECONDS = 0.05
+
+
+def worker(data_dir: str, backend: str, user_id: str, worker_index: int, ops: int, seed: int) -> dict:
+    configure(data_dir, backend)
+    from core.statistics_manager import StatisticsManager
+    from core.task_manager import TaskManager
+
+    rng = random.Random(seed)
+    stats = StatisticsManager(user_id)
+    tasks = TaskManager(user_id)
+    own_tasks = []
+    completed = 0
+
+    for i in range(ops):
+        stats.add_session_time(SESSION_SECONDS)
+        if rng.random() < 0.3:
+            stats.add_emotion_entry({
+                'emotions': [],
+                'risk_score': rng.uniform(0, 100),
+                'primary_emotion': {'emotion': rng.choice(['joy', 'neutral', 'fear'])}
+            })
+        own_tasks.append(tasks.add_task(f"{user_id} worker {worker_index} task {i}"))
+
+        if own_tasks and rng.random() < 0.2:
+            # Flush first so the task carries its final, merged id
+            tasks.flush()
+            task = rng.choice(own_tasks)
+            if not task['completed'] and tasks.complete_task(task['id']):
+                completed += 1
+        if rng.random() < 0.1:
+            stats.flush()
+            tasks.flush()
+        time.sleep(rng.uniform(0, 0.002))
+
+    stats.flush()
+    tasks.flush()
+    return {'user_id': user_id, 'sessions': ops, 'tasks': ops, 'completed': completed}
+
+
+def verify(data_dir: str, backend: str, user_id: str, expected: dict) -> list:
+    configure(data_dir, backend)
+    from core.statistics_manager import StatisticsManager
+    from core.task_manager import TaskManager
+
+    stats = StatisticsManager(user_id)
+    tasks = TaskManager(user_id)
+    problems = []
+
+    checks = [
+        ('sessions_completed', stats.data['sessions_completed'], expected['sessions']),
+        ('total_study_time', stats.data['total_study_time'], expected['sessions'] * SESSION_SECONDS),
+        ('daily series total', stats.daily_series.total(), expected['sessions'] * SESSION_SECONDS),
+        ('session records', len(stats.session_log), expected['sessions']),
+        ('tasks', len(tasks.tasks), expected['tasks']),
+        ('completed tasks', len([t for t in tasks.tasks if t['completed']]), expected['completed'])
+    ]
+    for name, actual, wanted in checks:
+        if actual != wanted:
+            problems.append(f"{user_id}: {name} is {actual}, expected {wanted}")
+
+    ids = [t['id'] for t in tasks.tasks]
+    if len(ids) != len(set(ids)):
+        problems.append(f"{user_id}: {len(ids) - len(set(ids))} duplicate task ids")
+    texts = [t['text'] for t in tasks.tasks]
+    if len(texts) != len(set(texts)):
+        problems.append(f"{user_id}: {len(texts) - len(set(texts))} tasks stored twice")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, default=2, help="Users sharing the data directory")
+    parser.add_argument('--workers', type=int, default=4, help="Concurrent processes per user")
+    parser.add_argument('--ops', type=int, default=150, help="Sessions and tasks added per worker")
+    parser.add_argument('--backend', choices=['json', 'sqlite'], default='json', help="Storage backend")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        jobs = [
+            (data_dir, args.backend, f"user{u}", w, args.ops, args.seed * 1000 + u * 100 + w)
+            for u in range(args.users) for w in range(args.workers)
+        ]
+        start = time.perf_counter()
+        with multiprocessing.Pool(len(jobs)) as pool:
+            results = pool.starmap(worker, jobs)
+        elapsed = time.perf_counter() - start
+
+        expected = {}
+        for result in results:
+            totals = expected.setdefault(result['user_id'], {'sessions': 0, 'tasks': 0, 'completed': 0})
+            for key in totals:
+                totals[key] += result[key]
+
+        problems = []
+        for user_id, totals in sorted(expected.items()):
+            problems.extend(verify(data_dir, args.backend, user_id, totals))
+
+    operations = sum(r['sessions'] + r['tasks'] + r['completed'] for r in results)
+    print(f"{len(jobs)} processes, {operations} writes in {elapsed:.1f}s ({args.backend})")
+    if problems:
+        for problem in problems:
+            print(f"❌ {problem}")
+        sys.exit(1)
+    print("✅ No lost or duplicated writes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Tests for the emotion result cache
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.emotion_cache import EmotionCache
+
+
+class EmotionCacheDiskTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def open_cache(self, max_disk_entries: int = 10) -> EmotionCache:
+        return EmotionCache(model_id="test-model", max_entries=0, persist=True,
+                            cache_dir=self.cache_dir, max_disk_entries=max_disk_entries)
+
+    def disk_files(self):
+        return [name for name in os.listdir(self.cache_dir) if name != 'model.json']
+
+    def test_disk_tier_stays_under_cap(self):
+        cache = self.open_cache()
+        for i in range(100):
+            cache.put(cache.make_key(f"check-in {i}", 3), {'risk_score': i})
+
+        self.assertLessEqual(len(self.disk_files()), 10)
+        self.assertEqual(cache.get_stats()['disk_entries'], len(self.disk_files()))
+
+    def test_recently_read_entries_survive_eviction(self):
+        cache = self.open_cache()
+        keep = cache.make_key("keep me", 3)
+        cache.put(keep, {'risk_score': 1})
+        for i in range(9):
+            cache.put(cache.make_key(f"check-in {i}", 3), {'risk_score': i})
+        for name in self.disk_files():
+            os.utime(os.path.join(self.cache_dir, name), (100, 100))
+        # Oldest file on disk until the read below marks it as used
+        os.utime(os.path.join(self.cache_dir, f"{keep}.json"), (50, 50))
+
+        self.assertIsNotNone(cache.get(keep))
+        cache.put(cache.make_key("one more", 3), {'risk_score': 2})
+        self.assertIsNotNone(cache.get(keep))
+
+    def test_oversized_store_trimmed_on_open(self):
+        cache = self.open_cache(max_disk_entries=1000)
+        for i in range(50):
+            cache.put(cache.make_key(f"check-in {i}", 3), {'risk_score': i})
+
+        self.open_cache(max_disk_entries=10)
+        self.assertLessEqual(len(self.disk_files()), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
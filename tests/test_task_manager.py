@@ -0,0 +1,73 @@
+"""
+Tests for task id allocation across restarts
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import config
+from core.task_manager import TaskManager
+
+
+class TaskIdTest(unittest.TestCase):
+    backend = 'json'
+
+    def open_tasks(self) -> TaskManager:
+        manager = TaskManager("alice")
+        self.managers.append(manager)
+        return manager
+
+    def setUp(self):
+        self.data_dir = tempfile.mkdtemp()
+        self.saved = (config.DATA_DIR, config.STORAGE_BACKEND, config.SQLITE_DB_FILE)
+        config.DATA_DIR = self.data_dir
+        config.STORAGE_BACKEND = self.backend
+        config.SQLITE_DB_FILE = os.path.join(self.data_dir, "study.db")
+        self.managers = []
+
+    def tearDown(self):
+        for manager in self.managers:
+            manager.flusher.close()
+        config.DATA_DIR, config.STORAGE_BACKEND, config.SQLITE_DB_FILE = self.saved
+        shutil.rmtree(self.data_dir, ignore_errors=True)
+
+    def test_deleted_id_not_reused_after_restart(self):
+        tasks = self.open_tasks()
+        tasks.add_task("first")
+        newest = tasks.add_task("second")
+        tasks.delete_task(newest['id'])
+        tasks.flush()
+
+        self.assertEqual(self.open_tasks().add_task("third")['id'], newest['id'] + 1)
+
+    def test_id_deleted_by_other_writer_not_reused(self):
+        tasks = self.open_tasks()
+        tasks.add_task("first")
+        tasks.flush()
+
+        other = self.open_tasks()
+        gone = other.add_task("short-lived")
+        other.flush()
+        other.delete_task(gone['id'])
+        other.flush()
+
+        task = tasks.add_task("second")
+        tasks.flush()
+        self.assertGreater(task['id'], gone['id'])
+
+    def test_delete_of_unknown_id_schedules_no_write(self):
+        tasks = self.open_tasks()
+        marks = tasks.get_persistence_stats()['marks']
+        self.assertEqual(tasks.delete_tasks([42]), 0)
+        self.assertEqual(tasks.get_persistence_stats()['marks'], marks)
+
+
+class SqliteTaskIdTest(TaskIdTest):
+    backend = 'sqlite'
+
+
+if __name__ == "__main__":
+    unittest.main()
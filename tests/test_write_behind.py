@@ -0,0 +1,55 @@
+"""
+Tests for the debounced write-behind flusher
+"""
+
+import os
+import sys
+import time
+import unittest
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core.write_behind import WriteBehind
+
+
+class WriteBehindTest(unittest.TestCase):
+    def test_failing_flush_backs_off(self):
+        calls = []
+
+        def flush_fn():
+            calls.append(time.monotonic())
+            raise OSError("read-only file system")
+
+        flusher = WriteBehind(flush_fn, "test", policy='relaxed', debounce_seconds=0.01, max_delay_seconds=0.2)
+        flusher.mark_dirty()
+        time.sleep(1.0)
+        stats = flusher.get_stats()
+        attempts = len(calls)
+        flusher.close()
+
+        # Retries after 0.1, 0.2, 0.2, ... seconds: a handful of attempts, not a busy loop
+        self.assertGreaterEqual(attempts, 2)
+        self.assertLessEqual(attempts, 10)
+        self.assertEqual(stats['pending'], 1)
+        self.assertEqual(stats['flushes'], 0)
+
+    def test_recovers_after_failure(self):
+        results = [OSError("disk full"), None]
+
+        def flush_fn():
+            result = results.pop(0) if results else None
+            if result is not None:
+                raise result
+
+        flusher = WriteBehind(flush_fn, "test", policy='relaxed', debounce_seconds=0.01, max_delay_seconds=0.2)
+        flusher.mark_dirty()
+        time.sleep(0.5)
+        stats = flusher.get_stats()
+        flusher.close()
+
+        self.assertEqual(stats['errors'], 1)
+        self.assertEqual(stats['flushes'], 1)
+        self.assertEqual(stats['pending'], 0)
+        self.assertEqual(stats['retry_delay_ms'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
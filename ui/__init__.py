@@ -1,6 +1,6 @@
 from .dashboard import render_dashboard
 from .timer_view import render_timer
-from .emotion_view import render_emotion_check
+from .emotion_view import render_emotion_check, start_emotion_model
 from .analytics_view import render_analytics
 from .settings_view import render_settings
 
@@ -8,6 +8,7 @@ __all__ = [
     'render_dashboard',
     'render_timer',
     'render_emotion_check',
+    'start_emotion_model',
     'render_analytics',
     'render_settings'
 ]
\ No newline at end of file
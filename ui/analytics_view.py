@@ -6,20 +6,22 @@ import streamlit as st
 import plotly.graph_objects as go
 import plotly.express as px
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from core.export_engine import ExportEngine, available_formats
+from core.session_log import WEEKDAYS
 
-def render_analytics(stats_manager):
+def render_analytics(stats_manager, task_manager=None):
     """Render the analytics view"""
     st.markdown('<h1 class="main-header">📊 Study Analytics</h1>', unsafe_allow_html=True)
     
     tab1, tab2, tab3 = st.tabs(["📈 Study Time", "💝 Emotions", "🎯 Goals"])
     
     with tab1:
-        render_study_time_analytics(stats_manager)
+        render_study_time_analytics(stats_manager, task_manager)
     
     with tab2:
         render_emotion_analytics(stats_manager)
@@ -27,7 +29,7 @@ def render_analytics(stats_manager):
     with tab3:
         render_goals_analytics(stats_manager)
 
-def render_study_time_analytics(stats_manager):
+def render_study_time_analytics(stats_manager, task_manager=None):
     """Render study time analytics"""
     st.subheader("📅 Weekly Study Pattern")
     
@@ -71,15 +73,8 @@ def render_study_time_analytics(stats_manager):
     # Monthly overview
     st.subheader("📆 Monthly Overview")
     
-    daily_sessions = stats_manager.data['daily_sessions']
-    last_30_days = []
-    
-    for i in range(30):
-        date = (datetime.now() - timedelta(days=29-i)).strftime("%Y-%m-%d")
-        minutes = daily_sessions.get(date, 0) // 60
-        last_30_days.append({'date': date, 'minutes': minutes})
-    
-    df_month = pd.DataFrame(last_30_days)
+    dates, seconds = stats_manager.get_daily_series(days=30)
+    df_month = pd.DataFrame({'date': dates, 'minutes': seconds // 60})
     
     fig2 = px.area(
         df_month, 
@@ -93,11 +88,53 @@ def render_study_time_analytics(stats_manager):
     
     st.plotly_chart(fig2, use_container_width=True)
     
+    st.markdown("---")
+    
+    # When during the week focus time happens
+    st.subheader("🕐 Focus Time by Hour")
+    
+    heatmap = stats_manager.get_study_heatmap()
+    if heatmap.any():
+        fig_heat = go.Figure(go.Heatmap(
+            z=heatmap / 60,
+            x=[f"{hour:02d}:00" for hour in range(24)],
+            y=WEEKDAYS,
+            colorscale='Purples',
+            hovertemplate='<b>%{y} %{x}</b><br>Focus Time: %{z:.0f} minutes<extra></extra>'
+        ))
+        fig_heat.update_layout(
+            title="Focus Minutes by Weekday and Hour",
+            yaxis_autorange='reversed',
+            height=350
+        )
+        st.plotly_chart(fig_heat, use_container_width=True)
+    else:
+        st.info("⏱️ Complete a focus session to see when you study best!")
+    
     # Export option
     st.markdown("---")
     if st.button("📥 Export Study Data to CSV"):
         filename = stats_manager.export_to_csv()
         st.success(f"✅ Data exported to: {filename}")
+    
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        export_format = st.selectbox("Full export format", available_formats())
+    with col2:
+        if st.button("📦 Prepare Full Export"):
+            st.session_state.export_archive = (
+                export_format,
+                ExportEngine(stats_manager, task_manager).archive_bytes(export_format)
+            )
+    
+    if 'export_archive' in st.session_state:
+        archive_format, archive = st.session_state.export_archive
+        st.download_button(
+            "⬇️ Download All Study Data",
+            data=archive,
+            file_name=f"study_data_{datetime.now().strftime('%Y%m%d')}_{archive_format}.zip",
+            mime="application/zip"
+        )
 
 def render_emotion_analytics(stats_manager):
     """Render emotion analytics"""
@@ -128,17 +165,17 @@ def render_emotion_analytics(stats_manager):
     # Emotion history chart
     st.subheader("📊 Emotion History")
     
-    emotion_history = stats_manager.data['emotion_history'][-14:]
+    times, emotion_history = stats_manager.get_emotion_timeline(14)
     
     if emotion_history:
-        df_emotions = pd.DataFrame([
-            {
-                'timestamp': datetime.fromisoformat(entry['timestamp']).strftime('%Y-%m-%d %H:%M'),
-                'risk_score': entry['risk_score'],
-                'emotion': entry['primary_emotion'].title() if entry['primary_emotion'] else 'Unknown'
-            }
-            for entry in emotion_history
-        ])
+        df_emotions = pd.DataFrame({
+            'timestamp': times,
+            'risk_score': [entry['risk_score'] for entry in emotion_history],
+            'emotion': [
+                entry['primary_emotion'].title() if entry['primary_emotion'] else 'Unknown'
+                for entry in emotion_history
+            ]
+        })
         
         fig3 = px.scatter(
             df_emotions, 
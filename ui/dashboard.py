@@ -6,9 +6,13 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from .emotion_view import start_emotion_model
 
 def render_dashboard(stats_manager, task_manager):
     """Render the main dashboard"""
+    # The landing page: start loading the emotion model now so the check-in page is ready when opened
+    start_emotion_model()
+    
     st.markdown('<h1 class="main-header">🎓 Your Study Dashboard</h1>', unsafe_allow_html=True)
     
     # Statistics overview
@@ -65,10 +69,10 @@ def render_dashboard(stats_manager, task_manager):
         
         # Tasks preview
         st.subheader("📝 Today's Tasks")
-        pending_tasks = task_manager.get_pending_tasks()
+        pending_tasks = task_manager.get_prioritized_tasks(limit=5)
         
         if pending_tasks:
-            for task in pending_tasks[:5]:
+            for task in pending_tasks:
                 priority_emoji = "🔴" if task['priority'] == "High" else "🟡" if task['priority'] == "Normal" else "🟢"
                 st.checkbox(
                     f"{priority_emoji} {task['text']}", 
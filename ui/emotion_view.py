@@ -2,11 +2,27 @@ import streamlit as st
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from core import get_inference_service
+
+@st.cache_resource
+def start_emotion_model(_emotion_analyzer=None):
+    """Create the shared inference service and start loading its model in the background, once per process"""
+    # All sessions share one model and one batching worker
+    inference_service = get_inference_service(_emotion_analyzer)
+    inference_service.analyzer.load_model_async()
+    return inference_service
 
 def render_emotion_check(emotion_analyzer, stats_manager):
     """Render the emotion check view"""
     st.markdown('<h1 class="main-header">💝 Emotional Wellness Check</h1>', unsafe_allow_html=True)
     
+    # Loading started with the app (see render_dashboard), so here it is only checked
+    inference_service = start_emotion_model(emotion_analyzer)
+    emotion_analyzer = inference_service.analyzer
+    
+    model_status = emotion_analyzer.get_load_status()
+    model_ready = model_status['status'] == 'ready'
+    
     col1, col2 = st.columns([1, 1])
     
     with col1:
@@ -23,10 +39,25 @@ def render_emotion_check(emotion_analyzer, stats_manager):
             help="Be honest and detailed for best results"
         )
         
+        if model_status['status'] == 'loading':
+            st.info("⏳ The AI model is still loading in the background. You can start writing in the meantime.")
+            if st.button("🔄 Check Again", use_container_width=True):
+                st.rerun()
+        elif model_status['status'] == 'failed':
+            st.error(f"❌ The AI model could not be loaded: {model_status['error']}")
+            if st.button("🔁 Retry Loading", use_container_width=True):
+                emotion_analyzer.load_model_async()
+                st.rerun()
+        
         col_btn1, col_btn2 = st.columns(2)
         
         with col_btn1:
-            analyze_btn = st.button("🔍 Analyze My Emotions", type="primary", use_container_width=True)
+            analyze_btn = st.button(
+                "🔍 Analyze My Emotions",
+                type="primary",
+                use_container_width=True,
+                disabled=not model_ready
+            )
         
         with col_btn2:
             clear_btn = st.button("🗑️ Clear Text", use_container_width=True)
@@ -36,7 +67,7 @@ def render_emotion_check(emotion_analyzer, stats_manager):
         if analyze_btn:
             if journal_text.strip():
                 with st.spinner("🧠 Analyzing your emotions..."):
-                    result = emotion_analyzer.analyze_emotion(journal_text)
+                    result = inference_service.analyze(journal_text)
                     
                     if result:
                         st.session_state.last_emotion_result = result
@@ -79,6 +110,8 @@ def render_emotion_check(emotion_analyzer, stats_manager):
             
             # Progress bar
             st.progress(risk_score / 100)
+            if result.get('stage') == 'lexicon':
+                st.caption("⚡ Quick analysis: clear-cut check-in answered without the full AI model")
             
             st.markdown("---")
             
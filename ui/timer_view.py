@@ -56,7 +56,11 @@ def render_timer(timer_manager, stats_manager, task_manager, audio_manager):
                 if timer_info['is_running']:
                     elapsed = timer_manager.get_elapsed_time()
                     if elapsed > 60:
-                        stats_manager.add_session_time(elapsed)
+                        stats_manager.add_session_time(
+                            elapsed,
+                            start_time=timer_manager.start_time,
+                            phase=timer_info['phase']
+                        )
                         audio_manager.play_end_sound()
                 timer_manager.stop()
                 st.rerun()
@@ -132,8 +136,26 @@ def render_timer(timer_manager, stats_manager, task_manager, audio_manager):
                     st.success("Task added!")
                     st.rerun()
         
+        with st.expander("📋 Add Several Tasks"):
+            with st.form("bulk_task_form"):
+                bulk_text = st.text_area(
+                    "Tasks",
+                    placeholder="One task per line, or CSV with text,priority columns"
+                )
+                bulk_format = st.radio("Format", ["One per line", "CSV"], horizontal=True)
+                bulk_priority = st.selectbox("Default priority", ["High", "Normal", "Low"], index=1)
+                
+                if st.form_submit_button("➕ Add All", use_container_width=True):
+                    added = task_manager.import_tasks(
+                        bulk_text,
+                        fmt="csv" if bulk_format == "CSV" else "text",
+                        priority=bulk_priority
+                    )
+                    st.success(f"{len(added)} tasks added!")
+                    st.rerun()
+        
         # Display tasks
-        pending_tasks = task_manager.get_pending_tasks()
+        pending_tasks = task_manager.get_prioritized_tasks()
         
         if pending_tasks:
             for task in pending_tasks:
@@ -155,5 +177,17 @@ def render_timer(timer_manager, stats_manager, task_manager, audio_manager):
                     if st.button("🗑️", key=f"del_{task['id']}"):
                         task_manager.delete_task(task['id'])
                         st.rerun()
+            
+            col_all, col_clear = st.columns(2)
+            with col_all:
+                if st.button("✅ Complete All", use_container_width=True):
+                    completed = task_manager.complete_tasks([task['id'] for task in pending_tasks])
+                    stats_manager.add_completed_tasks([task['text'] for task in completed])
+                    st.success(f"✅ {len(completed)} tasks completed!")
+                    st.rerun()
+            with col_clear:
+                if st.button("🧹 Clear Completed", use_container_width=True):
+                    task_manager.delete_tasks([task['id'] for task in task_manager.get_completed_tasks()])
+                    st.rerun()
         else:
             st.info("No tasks yet!")
\ No newline at end of file